@@ -40,6 +40,20 @@ class Book:
         return self.stock >= quantity
 
 
+@dataclass
+class AvailableBook(Book):
+    """Book with the copies on offer: stock minus the copies held in carts"""
+    available: int = 0
+    
+    def is_available(self) -> bool:
+        """Check if any copy is on offer"""
+        return self.available > 0
+    
+    def can_order(self, quantity: int) -> bool:
+        """Check if enough copies are on offer"""
+        return self.available >= quantity
+
+
 @dataclass
 class Cart:
     """Cart entity"""
@@ -63,3 +77,17 @@ class CartItem:
     def calculate_subtotal(self, book_price: Decimal) -> Decimal:
         """Calculate subtotal for this cart item"""
         return book_price * self.quantity
+
+
+@dataclass
+class StockHold:
+    """Stock hold entity: copies of a book set aside for a cart until `expires_at`"""
+    id: Optional[int]
+    cart_id: int
+    book_id: int
+    quantity: int
+    expires_at: datetime
+    
+    def is_active(self, now: datetime) -> bool:
+        """Check if the hold still counts against the book's stock"""
+        return self.expires_at > now
@@ -94,6 +94,10 @@ AUTH_USER_MODEL = 'web.CustomerModel'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/books/'
 
+# Seconds the copies put in a cart stay reserved after the item's last change
+# (see usecases/stock_usecases.py)
+STOCK_HOLD_TTL = 15 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from infrastructure.django_repositories import DjangoStockHoldRepository
+from usecases.stock_usecases import ReleaseExpiredHoldsUseCase
+
+
+class Command(BaseCommand):
+    help = 'Delete expired stock holds (they already no longer count against availability)'
+
+    def handle(self, *args, **kwargs):
+        released = ReleaseExpiredHoldsUseCase(DjangoStockHoldRepository()).execute()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired holds'))
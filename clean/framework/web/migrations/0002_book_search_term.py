@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_books(apps, schema_editor):
+    from infrastructure.search_index import book_terms
+
+    BookModel = apps.get_model('web', 'BookModel')
+    BookSearchTermModel = apps.get_model('web', 'BookSearchTermModel')
+    BookSearchTermModel.objects.bulk_create([
+        BookSearchTermModel(term=term, book_id=book_id, weight=weight)
+        for book_id, title, author in BookModel.objects.values_list('id', 'title', 'author').iterator()
+        for term, weight in book_terms(title, author).items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchTermModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='web.bookmodel')),
+            ],
+            options={
+                'db_table': 'book_search_terms',
+                'unique_together': {('term', 'book')},
+            },
+        ),
+        migrations.RunPython(index_existing_books, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0002_book_search_term'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookmodel',
+            index=models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmodel',
+            index=models.Index(fields=['price', 'id'], name='book_price_id_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0003_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHoldModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='web.bookmodel')),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='web.cartmodel')),
+            ],
+            options={
+                'db_table': 'stock_holds',
+                'indexes': [models.Index(fields=['book', 'expires_at', 'quantity'], name='stockhold_book_expiry_idx')],
+                'unique_together': {('cart', 'book')},
+            },
+        ),
+    ]
@@ -1,6 +1,6 @@
 # Import models from infrastructure layer to register with Django
-from infrastructure.django_models import CustomerModel, BookModel, CartModel, CartItemModel
+from infrastructure.django_models import CustomerModel, BookModel, BookSearchTermModel, CartModel, CartItemModel
 
 # Re-export them so Django can discover them
-__all__ = ['CustomerModel', 'BookModel', 'CartModel', 'CartItemModel']
+__all__ = ['CustomerModel', 'BookModel', 'BookSearchTermModel', 'CartModel', 'CartItemModel']
 
@@ -7,6 +7,7 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('books/', views.books, name='books'),
+    path('api/books/search/', views.api_search_books, name='api_search_books'),
     path('cart/', views.cart_view, name='cart'),
     path('cart/add/<int:book_id>/', views.add_to_cart_view, name='add_to_cart'),
     path('cart/remove/<int:item_id>/', views.remove_from_cart_view, name='remove_from_cart'),
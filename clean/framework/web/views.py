@@ -1,3 +1,7 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth import login as auth_login, logout as auth_logout
@@ -12,14 +16,16 @@ from usecases.customer_usecases import (
     RemoveFromCartUseCase,
     UpdateCartItemQuantityUseCase
 )
-from usecases.book_usecases import ListBooksUseCase
+from usecases.book_usecases import ListBooksUseCase, SearchBooksUseCase
+from usecases.stock_usecases import ReserveStockUseCase
 
 # Import repositories
 from infrastructure.django_repositories import (
     DjangoCustomerRepository,
     DjangoBookRepository,
     DjangoCartRepository,
-    DjangoCartItemRepository
+    DjangoCartItemRepository,
+    DjangoStockHoldRepository
 )
 
 # Initialize repositories
@@ -27,15 +33,26 @@ customer_repo = DjangoCustomerRepository()
 book_repo = DjangoBookRepository()
 cart_repo = DjangoCartRepository()
 cart_item_repo = DjangoCartItemRepository()
+stock_hold_repo = DjangoStockHoldRepository()
 
 # Initialize use cases
 register_usecase = RegisterCustomerUseCase(customer_repo)
 login_usecase = LoginCustomerUseCase(customer_repo)
-list_books_usecase = ListBooksUseCase(book_repo)
-add_to_cart_usecase = AddToCartUseCase(cart_repo, cart_item_repo, book_repo)
+list_books_usecase = ListBooksUseCase(book_repo, stock_hold_repo)
+search_books_usecase = SearchBooksUseCase(book_repo)
+reserve_stock_usecase = ReserveStockUseCase(stock_hold_repo, timedelta(seconds=settings.STOCK_HOLD_TTL))
+add_to_cart_usecase = AddToCartUseCase(cart_repo, cart_item_repo, book_repo, reserve_stock_usecase)
 view_cart_usecase = ViewCartUseCase(cart_repo, cart_item_repo, book_repo)
-remove_from_cart_usecase = RemoveFromCartUseCase(cart_item_repo)
-update_cart_item_usecase = UpdateCartItemQuantityUseCase(cart_item_repo, book_repo)
+remove_from_cart_usecase = RemoveFromCartUseCase(cart_item_repo, stock_hold_repo)
+update_cart_item_usecase = UpdateCartItemQuantityUseCase(cart_item_repo, reserve_stock_usecase)
+
+# Orderings offered on the books page
+BOOK_ORDERING_LABELS = {
+    'title': 'Tên sách (A-Z)',
+    '-title': 'Tên sách (Z-A)',
+    'price': 'Giá tăng dần',
+    '-price': 'Giá giảm dần',
+}
 
 
 def home(request):
@@ -90,9 +107,49 @@ def logout_view(request):
 
 @login_required
 def books(request):
-    """List all books"""
-    books = list_books_usecase.execute()
-    return render(request, 'books.html', {'books': books})
+    """List books, one page at a time"""
+    ordering = request.GET.get('ordering', 'title')
+    if ordering not in BOOK_ORDERING_LABELS:
+        ordering = 'title'
+    
+    try:
+        page = list_books_usecase.execute(ordering, request.GET.get('cursor'))
+    except ValueError as e:
+        messages.error(request, str(e))
+        page = list_books_usecase.execute(ordering)
+    
+    return render(request, 'books.html', {
+        'books': page.books,
+        'ordering': page.ordering,
+        'orderings': BOOK_ORDERING_LABELS,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@login_required
+def api_search_books(request):
+    """Search API: GET ?q=<query>&page=<n>, results most relevant first"""
+    try:
+        result = search_books_usecase.execute(request.GET.get('q', ''), int(request.GET.get('page', 1)))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page'}, status=400)
+    
+    return JsonResponse({
+        'query': result.query,
+        'page': result.page,
+        'has_next': result.has_next,
+        'results': [
+            {
+                'id': book.id,
+                'title': book.title,
+                'author': book.author,
+                'price': str(book.price),
+                'stock': book.stock,
+            }
+            for book in result.books
+        ],
+    })
 
 
 @login_required
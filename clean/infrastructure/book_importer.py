@@ -0,0 +1,190 @@
+"""
+Book Importer - Infrastructure Layer
+Bulk catalogue import from CSV or JSONL
+
+Rows are streamed from the file, validated, and written in chunks of
+batch_size. Each chunk is one transaction: one query finds which of its
+books already exist (a book is identified by title and author), new books go in
+with bulk_create and changed ones with bulk_update; unchanged books are
+not written at all. New books are added to the search index in the same
+transaction, as bulk_create sends no post_save. Within a chunk the last
+row for a book wins, and a later chunk simply updates a book an earlier one
+created, so nothing but the current chunk is held in memory whatever the file
+size.
+
+A failure aborts the current chunk only; earlier chunks stay committed, and as
+rows are matched by title and author, running the import again is safe.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, Tuple
+
+from django.db import transaction
+
+from infrastructure.django_models import BookModel
+from infrastructure.search_index import index_new_books
+
+FORMATS = ('csv', 'jsonl')
+BATCH_SIZE = 5000
+UPDATE_BATCH_SIZE = 500  # bulk_update builds one CASE per field, keep its statements small
+MAX_TEXT_LENGTH = 255
+MAX_PRICE = Decimal('99999999.99')  # max_digits=10, decimal_places=2
+MAX_STOCK = 2 ** 31 - 1  # IntegerField, a 32-bit INT on MySQL
+MAX_REPORTED_ERRORS = 50
+
+
+class RowError(ValueError):
+    """A row that cannot be imported"""
+    pass
+
+
+@dataclass
+class ImportStats:
+    """Counters of one import run"""
+    read: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)  # (line, message) of the first MAX_REPORTED_ERRORS invalid rows
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(path: str) -> str:
+    """File format from the extension: .jsonl/.ndjson or csv"""
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream: Iterable[str], file_format: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, raw row); a JSONL line that is not an object gives a RowError as row"""
+    if file_format == 'csv':
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            row = RowError(f'invalid JSON: {e}')
+        if not isinstance(row, (dict, RowError)):
+            row = RowError('not a JSON object')
+        yield line, row
+
+
+def _text(row: dict, name: str) -> str:
+    value = str(row.get(name) or '').strip()
+    if not value:
+        raise RowError(f'{name} is required')
+    if len(value) > MAX_TEXT_LENGTH:
+        raise RowError(f'{name} is longer than {MAX_TEXT_LENGTH} characters')
+    return value
+
+
+def validate_row(row) -> Tuple[str, str, Decimal, int]:
+    """(title, author, price, stock) of a raw row, or RowError"""
+    if isinstance(row, RowError):
+        raise row
+    title, author = _text(row, 'title'), _text(row, 'author')
+    try:
+        price = Decimal(str(row.get('price', '')).strip())
+    except InvalidOperation:
+        raise RowError(f'invalid price {row.get("price")!r}')
+    if not price.is_finite():
+        raise RowError(f'invalid price {row.get("price")!r}')
+    # Range first: quantize() fails on numbers longer than its precision (1e100)
+    if not 0 <= price <= MAX_PRICE:
+        raise RowError(f'price {price} out of range')
+    price = price.quantize(Decimal('0.01'))
+    try:
+        stock = int(str(row.get('stock', '')).strip())
+    except ValueError:
+        raise RowError(f'invalid stock {row.get("stock")!r}')
+    if stock < 0:
+        raise RowError('stock must not be negative')
+    if stock > MAX_STOCK:
+        raise RowError(f'stock {stock} out of range')
+    return title, author, price, stock
+
+
+def write_chunk(chunk: Dict[Tuple[str, str], Tuple[Decimal, int]], stats: ImportStats) -> None:
+    """Upsert one chunk of {(title, author): (price, stock)} in a single transaction"""
+    with transaction.atomic():
+        existing = {}
+        titles = {title for title, _ in chunk}
+        # Oldest book first if the catalogue already holds duplicates
+        for book_id, title, author, price, stock in (
+            BookModel.objects.filter(title__in=titles).order_by('-id')
+            .values_list('id', 'title', 'author', 'price', 'stock')
+        ):
+            existing[(title, author)] = (book_id, price, stock)
+
+        new_books, changed_books = [], []
+        for (title, author), (price, stock) in chunk.items():
+            if (title, author) not in existing:
+                new_books.append(BookModel(title=title, author=author, price=price, stock=stock))
+                continue
+            book_id, old_price, old_stock = existing[(title, author)]
+            if (old_price, old_stock) == (price, stock):
+                stats.unchanged += 1
+            else:
+                changed_books.append(BookModel(id=book_id, price=price, stock=stock))
+
+        BookModel.objects.bulk_create(new_books, batch_size=BATCH_SIZE)
+        if new_books and new_books[0].pk is None:
+            # MySQL does not return the ids of bulk-created rows
+            ids = {
+                (title, author): book_id
+                for book_id, title, author in BookModel.objects.filter(
+                    title__in={book.title for book in new_books}
+                ).values_list('id', 'title', 'author')
+            }
+            for book in new_books:
+                book.pk = ids[(book.title, book.author)]
+        index_new_books(new_books)
+        BookModel.objects.bulk_update(changed_books, ['price', 'stock'], batch_size=UPDATE_BATCH_SIZE)
+    stats.created += len(new_books)
+    stats.updated += len(changed_books)
+
+
+def import_books(stream: Iterable[str], file_format: str, batch_size: int = BATCH_SIZE,
+                 on_chunk=None) -> ImportStats:
+    """Import every row of stream; on_chunk(stats) is called after each committed chunk"""
+    stats = ImportStats()
+    chunk = {}
+    for line, row in read_rows(stream, file_format):
+        stats.read += 1
+        try:
+            title, author, price, stock = validate_row(row)
+        except RowError as e:
+            stats.invalid += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append((line, str(e)))
+            continue
+        if (title, author) in chunk:
+            stats.duplicates += 1
+        chunk[(title, author)] = (price, stock)
+        if len(chunk) >= batch_size:
+            write_chunk(chunk, stats)
+            chunk = {}
+            if on_chunk:
+                on_chunk(stats)
+    if chunk:
+        write_chunk(chunk, stats)
+        if on_chunk:
+            on_chunk(stats)
+    return stats
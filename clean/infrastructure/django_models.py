@@ -62,11 +62,33 @@ class BookModel(models.Model):
     class Meta:
         app_label = 'web'
         db_table = 'books'
+        # id completes each index so keyset pages ((title, id) > (t, i), see
+        # DjangoBookRepository.get_page) are range scans
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['price', 'id'], name='book_price_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
 
+class BookSearchTermModel(models.Model):
+    """Django model for one posting of the book search index: `term` occurs in `book`
+    with `weight` (term frequency in the title x3 plus in the author)"""
+    term = models.CharField(max_length=64)
+    book = models.ForeignKey(BookModel, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveIntegerField()
+    
+    class Meta:
+        app_label = 'web'
+        db_table = 'book_search_terms'
+        unique_together = ('term', 'book')
+    
+    def __str__(self):
+        return f"{self.term} -> {self.book_id}"
+
+
 class CartModel(models.Model):
     """Django model for Cart entity"""
     customer = models.ForeignKey(CustomerModel, on_delete=models.CASCADE)
@@ -93,3 +115,23 @@ class CartItemModel(models.Model):
     
     def __str__(self):
         return f"{self.quantity} x {self.book.title}"
+
+
+class StockHoldModel(models.Model):
+    """Django model for StockHold entity"""
+    cart = models.ForeignKey(CartModel, on_delete=models.CASCADE)
+    book = models.ForeignKey(BookModel, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        app_label = 'web'
+        db_table = 'stock_holds'
+        unique_together = ('cart', 'book')
+        # SUM(quantity) of a book's unexpired holds is read from this index alone
+        indexes = [
+            models.Index(fields=['book', 'expires_at', 'quantity'], name='stockhold_book_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.quantity} x book {self.book_id} until {self.expires_at}"
@@ -2,16 +2,21 @@
 Repository Implementations using Django ORM
 These classes implement the interfaces defined in the interfaces layer
 """
-from typing import List, Optional
-from domain.entities import Customer, Book, Cart, CartItem
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from domain.entities import Customer, Book, Cart, CartItem, StockHold
 from interfaces.repositories import (
     ICustomerRepository, IBookRepository,
-    ICartRepository, ICartItemRepository
+    ICartRepository, ICartItemRepository, IStockHoldRepository
 )
 from infrastructure.django_models import (
-    CustomerModel, BookModel, CartModel, CartItemModel
+    CustomerModel, BookModel, CartModel, CartItemModel, StockHoldModel
 )
+from infrastructure import search_index
 from django.contrib.auth.hashers import make_password, check_password
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from decimal import Decimal
 
 
@@ -87,6 +92,24 @@ class DjangoBookRepository(IBookRepository):
         models = BookModel.objects.all()
         return [self._to_entity(m) for m in models]
     
+    def get_page(self, ordering: str, limit: int,
+                 after: Optional[Tuple[str, int]] = None, backwards: bool = False) -> List[Book]:
+        """Get one page of books with a keyset query (no OFFSET, no COUNT)"""
+        field = ordering.lstrip('-')
+        descending = ordering.startswith('-') != backwards
+        lookup = 'lt' if descending else 'gt'
+        models = BookModel.objects.all()
+        if after is not None:
+            value, book_id = after
+            # The redundant bound on field alone lets the (field, id) index seek
+            # straight to the position instead of scanning up to it
+            models = models.filter(
+                Q(**{f'{field}__{lookup}e': value}),
+                Q(**{f'{field}__{lookup}': value}) | Q(**{f'id__{lookup}': book_id}),
+            )
+        order = (f'-{field}', '-id') if descending else (field, 'id')
+        return [self._to_entity(m) for m in models.order_by(*order)[:limit]]
+    
     def get_by_id(self, book_id: int) -> Optional[Book]:
         """Get book by ID"""
         try:
@@ -116,14 +139,11 @@ class DjangoBookRepository(IBookRepository):
         model.save()
         return self._to_entity(model)
     
-    def search(self, query: str) -> List[Book]:
-        """Search books by title or author"""
-        models = BookModel.objects.filter(
-            title__icontains=query
-        ) | BookModel.objects.filter(
-            author__icontains=query
-        )
-        return [self._to_entity(m) for m in models]
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> List[Book]:
+        """Search books by title or author through the search index, most relevant first"""
+        ranked = search_index.search(query, offset, limit)
+        models = BookModel.objects.in_bulk([book_id for book_id, _ in ranked])
+        return [self._to_entity(models[book_id]) for book_id, _ in ranked if book_id in models]
 
 
 class DjangoCartRepository(ICartRepository):
@@ -174,6 +194,14 @@ class DjangoCartItemRepository(ICartItemRepository):
         models = CartItemModel.objects.filter(cart_id=cart_id)
         return [self._to_entity(m) for m in models]
     
+    def get_by_id(self, cart_item_id: int) -> Optional[CartItem]:
+        """Get cart item by ID"""
+        try:
+            model = CartItemModel.objects.get(id=cart_item_id)
+            return self._to_entity(model)
+        except CartItemModel.DoesNotExist:
+            return None
+    
     def get_by_cart_and_book(self, cart_id: int, book_id: int) -> Optional[CartItem]:
         """Get specific item in cart"""
         try:
@@ -206,3 +234,79 @@ class DjangoCartItemRepository(ICartItemRepository):
     def clear_cart(self, cart_id: int) -> None:
         """Remove all items from cart"""
         CartItemModel.objects.filter(cart_id=cart_id).delete()
+
+
+class DjangoStockHoldRepository(IStockHoldRepository):
+    """Django implementation of StockHold repository.
+    
+    `place` locks the book row (SELECT ... FOR UPDATE) only for the few statements
+    that check availability and write the hold, so holds on the same book are
+    placed one at a time; no lock outlives the call.
+    """
+    
+    def place(self, hold: StockHold, now: datetime) -> int:
+        """Place a hold if the book's stock minus the other active holds covers it"""
+        with transaction.atomic():
+            try:
+                stock = BookModel.objects.select_for_update().values_list('stock', flat=True).get(id=hold.book_id)
+            except BookModel.DoesNotExist:
+                raise ValueError("Book not found")
+            held_by_others = (
+                StockHoldModel.objects
+                .filter(book_id=hold.book_id, expires_at__gt=now)
+                .exclude(cart_id=hold.cart_id)
+                .aggregate(total=Sum('quantity'))['total'] or 0
+            )
+            available = max(stock - held_by_others, 0)
+            if hold.quantity <= available:
+                StockHoldModel.objects.update_or_create(
+                    cart_id=hold.cart_id, book_id=hold.book_id,
+                    defaults={'quantity': hold.quantity, 'expires_at': hold.expires_at},
+                )
+            # Expired holds stop counting on their own; drop them while the book is locked anyway
+            StockHoldModel.objects.filter(book_id=hold.book_id, expires_at__lte=now).delete()
+        return available
+    
+    def add_to_cart(
+        self, cart_id: int, book_id: int, quantity: int, expires_at: datetime, now: datetime
+    ) -> Tuple[int, Optional[CartItem]]:
+        """Add to the cart item and hold its new quantity in one transaction, the book locked first"""
+        with transaction.atomic():
+            if not BookModel.objects.select_for_update().filter(id=book_id).exists():
+                raise ValueError("Book not found")
+            item = CartItemModel.objects.select_for_update().filter(cart_id=cart_id, book_id=book_id).first()
+            new_quantity = quantity + (item.quantity if item else 0)
+            available = self.place(
+                StockHold(id=None, cart_id=cart_id, book_id=book_id, quantity=new_quantity, expires_at=expires_at),
+                now
+            )
+            if new_quantity > available:
+                return available, None
+            if item is None:
+                item = CartItemModel.objects.create(cart_id=cart_id, book_id=book_id, quantity=new_quantity)
+            else:
+                item.quantity = new_quantity
+                item.save(update_fields=['quantity'])
+        return available, CartItem(id=item.id, cart_id=item.cart_id, book_id=item.book_id, quantity=item.quantity)
+    
+    def get_available(self, book_ids: List[int], now: datetime) -> Dict[int, int]:
+        """Stock minus active holds, one query with an indexed subquery per book"""
+        held = (
+            StockHoldModel.objects.filter(book=OuterRef('pk'), expires_at__gt=now)
+            .values('book').annotate(total=Sum('quantity')).values('total')
+        )
+        rows = BookModel.objects.filter(id__in=book_ids).annotate(
+            available=F('stock') - Coalesce(Subquery(held, output_field=IntegerField()), Value(0)),
+        ).values_list('id', 'available')
+        return {book_id: max(available, 0) for book_id, available in rows}
+    
+    def release(self, cart_id: int, book_ids: Optional[List[int]] = None) -> None:
+        """Remove the cart's holds"""
+        holds = StockHoldModel.objects.filter(cart_id=cart_id)
+        if book_ids is not None:
+            holds = holds.filter(book_id__in=book_ids)
+        holds.delete()
+    
+    def release_expired(self, now: datetime) -> int:
+        """Remove expired holds"""
+        return StockHoldModel.objects.filter(expires_at__lte=now).delete()[0]
@@ -0,0 +1,144 @@
+"""
+Book Search Index - Infrastructure Layer
+Inverted index over book titles and authors, stored in BookSearchTermModel
+
+Titles and authors are tokenised (lower-cased, Vietnamese diacritics folded, split
+on non-word characters) into postings. A query is answered from the postings
+alone, through the (term, book) index, instead of scanning every row with
+LIKE '%q%'. A book matches when it contains every query term; matches are ranked
+by TF-IDF: sum over query terms of weight * log(1 + N / df).
+
+The index follows book saves and deletes (signals connected in WebConfig.ready);
+the book importer indexes the books it bulk-creates itself, and the
+rebuild_search_index command rebuilds it after any other bulk_create / update().
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.signals import post_delete, post_save
+
+from infrastructure.django_models import BookModel, BookSearchTermModel
+
+TITLE_WEIGHT = 3
+AUTHOR_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+BOOK_COUNT_CACHE_KEY = 'web:search:book_count'
+BOOK_COUNT_TIMEOUT = 300
+
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalised search terms"""
+    # 'đ' is a letter of its own, not a 'd' with a combining mark
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [token[:MAX_TERM_LENGTH] for token in WORD.findall(text)]
+
+
+def book_terms(title: str, author: str) -> Counter:
+    """Weight of every term of a book"""
+    weights = Counter()
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(author):
+        weights[term] += AUTHOR_WEIGHT
+    return weights
+
+
+def index_book(model: BookModel) -> None:
+    """Replace the postings of one book"""
+    with transaction.atomic():
+        BookSearchTermModel.objects.filter(book=model).delete()
+        BookSearchTermModel.objects.bulk_create([
+            BookSearchTermModel(term=term, book=model, weight=weight)
+            for term, weight in book_terms(model.title, model.author).items()
+        ])
+
+
+def index_new_books(models: List[BookModel], batch_size: int = 2000) -> None:
+    """Add the postings of books that have none yet, e.g. fresh from bulk_create"""
+    BookSearchTermModel.objects.bulk_create([
+        BookSearchTermModel(term=term, book_id=model.pk, weight=weight)
+        for model in models
+        for term, weight in book_terms(model.title, model.author).items()
+    ], batch_size=batch_size)
+    if models:
+        cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def rebuild_index(batch_size: int = 2000) -> int:
+    """Rebuild every posting; returns the number of books indexed"""
+    indexed = 0
+    with transaction.atomic():
+        BookSearchTermModel.objects.all().delete()
+        last_id = 0
+        while True:
+            books = list(
+                BookModel.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'title', 'author')[:batch_size]
+            )
+            if not books:
+                break
+            BookSearchTermModel.objects.bulk_create([
+                BookSearchTermModel(term=term, book_id=book_id, weight=weight)
+                for book_id, title, author in books
+                for term, weight in book_terms(title, author).items()
+            ], batch_size=batch_size)
+            indexed += len(books)
+            last_id = books[-1][0]
+    cache.delete(BOOK_COUNT_CACHE_KEY)
+    return indexed
+
+
+def _on_book_saved(sender, instance, update_fields=None, **kwargs):
+    # e.g. stock-only saves leave the postings as they are
+    if update_fields is None or {'title', 'author'} & set(update_fields):
+        index_book(instance)
+    if kwargs.get('created'):
+        cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def _on_book_deleted(sender, instance, **kwargs):
+    # The postings themselves go with the book (on_delete=CASCADE)
+    cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def connect_signals() -> None:
+    """Keep the index in step with BookModel saves and deletes"""
+    post_save.connect(_on_book_saved, sender=BookModel, dispatch_uid='web.search.saved')
+    post_delete.connect(_on_book_deleted, sender=BookModel, dispatch_uid='web.search.deleted')
+
+
+def search(query: str, offset: int = 0, limit: int = 20) -> List[Tuple[int, float]]:
+    """(book id, score) of the books containing every query term, best first"""
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    book_count = cache.get_or_set(BOOK_COUNT_CACHE_KEY, BookModel.objects.count, BOOK_COUNT_TIMEOUT)
+    document_frequency = dict(
+        BookSearchTermModel.objects.filter(term__in=terms).values_list('term').annotate(df=Count('id'))
+    )
+    if len(document_frequency) < len(terms):
+        return []  # some term occurs nowhere
+
+    idf = Case(
+        *(When(term=term, then=Value(math.log(1 + book_count / df))) for term, df in document_frequency.items()),
+        output_field=FloatField(),
+    )
+    return list(
+        BookSearchTermModel.objects.filter(term__in=terms)
+        .values('book_id')
+        .annotate(matched=Count('term'), score=Sum(F('weight') * idf, output_field=FloatField()))
+        .filter(matched=len(terms))
+        .order_by('-score', 'book_id')
+        .values_list('book_id', 'score')[offset:offset + limit]
+    )
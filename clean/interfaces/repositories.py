@@ -3,8 +3,9 @@ Repository Interfaces - Abstract base classes that define data access contracts
 These are interfaces that will be implemented by the infrastructure layer
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from domain.entities import Customer, Book, Cart, CartItem
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from domain.entities import Customer, Book, Cart, CartItem, StockHold
 
 
 class ICustomerRepository(ABC):
@@ -44,6 +45,14 @@ class IBookRepository(ABC):
         """Get all books"""
         pass
     
+    @abstractmethod
+    def get_page(self, ordering: str, limit: int,
+                 after: Optional[Tuple[str, int]] = None, backwards: bool = False) -> List[Book]:
+        """Get up to `limit` books sorted by `ordering` ('title', '-title', 'price', '-price')
+        then id, starting strictly after the (sort value, id) position `after`.
+        With `backwards`, walk the ordering in reverse from `after` instead"""
+        pass
+    
     @abstractmethod
     def get_by_id(self, book_id: int) -> Optional[Book]:
         """Get book by ID"""
@@ -60,8 +69,8 @@ class IBookRepository(ABC):
         pass
     
     @abstractmethod
-    def search(self, query: str) -> List[Book]:
-        """Search books by title or author"""
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> List[Book]:
+        """Search books by title or author, most relevant first"""
         pass
 
 
@@ -92,6 +101,11 @@ class ICartItemRepository(ABC):
         """Get all items in a cart"""
         pass
     
+    @abstractmethod
+    def get_by_id(self, cart_item_id: int) -> Optional[CartItem]:
+        """Get cart item by ID"""
+        pass
+    
     @abstractmethod
     def get_by_cart_and_book(self, cart_id: int, book_id: int) -> Optional[CartItem]:
         """Get specific item in cart"""
@@ -116,3 +130,43 @@ class ICartItemRepository(ABC):
     def clear_cart(self, cart_id: int) -> None:
         """Remove all items from cart"""
         pass
+
+
+class IStockHoldRepository(ABC):
+    """Interface for stock hold data access"""
+    
+    @abstractmethod
+    def place(self, hold: StockHold, now: datetime) -> int:
+        """Atomically work out how many copies of the book are available to the cart
+        at `now` (stock minus the other carts' active holds) and, if that covers
+        `hold.quantity`, place `hold`, replacing the cart's previous hold on the book.
+        Expired holds on the book may be deleted on the way. Returns the available
+        count; raises ValueError if the book does not exist"""
+        pass
+    
+    @abstractmethod
+    def add_to_cart(
+        self, cart_id: int, book_id: int, quantity: int, expires_at: datetime, now: datetime
+    ) -> Tuple[int, Optional[CartItem]]:
+        """Atomically add `quantity` copies to the cart's item for the book (creating
+        it if needed) and hold the item's new quantity until `expires_at`, as `place`
+        does; the book is locked before the item's quantity is read, so concurrent
+        adds cannot lose one another. Returns the available count and the item, or
+        None and nothing written if the copies are not available; raises ValueError
+        if the book does not exist"""
+        pass
+    
+    @abstractmethod
+    def get_available(self, book_ids: List[int], now: datetime) -> Dict[int, int]:
+        """Get stock minus active holds for each existing book"""
+        pass
+    
+    @abstractmethod
+    def release(self, cart_id: int, book_ids: Optional[List[int]] = None) -> None:
+        """Remove the cart's holds, on every book or only on `book_ids`"""
+        pass
+    
+    @abstractmethod
+    def release_expired(self, now: datetime) -> int:
+        """Remove holds expired at `now`; returns how many"""
+        pass
@@ -1,18 +1,112 @@
 """Use cases for book operations"""
-from typing import List
-from domain.entities import Book
-from interfaces.repositories import IBookRepository
+import base64
+import binascii
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from domain.entities import AvailableBook, Book
+from interfaces.repositories import IBookRepository, IStockHoldRepository
+
+BOOK_ORDERINGS = ('title', '-title', 'price', '-price')
+
+
+@dataclass
+class BookPage:
+    """One page of the catalogue; the cursors are None when there is no such page"""
+    books: List[AvailableBook]
+    ordering: str
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
 
 class ListBooksUseCase:
-    """Use case for listing all books"""
+    """Use case for listing books one page at a time.
     
-    def __init__(self, book_repo: IBookRepository):
+    Pages use keyset (cursor) pagination on (ordering field, id): each page is read
+    right after the last row of the previous one, so a page costs the same
+    anywhere in the catalogue and the total number of books is never counted.
+    Each book comes with the copies on offer: its stock minus the active holds.
+    """
+    
+    def __init__(self, book_repo: IBookRepository, stock_hold_repo: IStockHoldRepository, page_size: int = 20):
+        self.book_repo = book_repo
+        self.stock_hold_repo = stock_hold_repo
+        self.page_size = page_size
+    
+    def execute(self, ordering: str = 'title', cursor: Optional[str] = None) -> BookPage:
+        """Get the first page for `ordering`, or the page a cursor points to"""
+        if ordering not in BOOK_ORDERINGS:
+            raise ValueError("Invalid ordering")
+        after, backwards = None, False
+        if cursor:
+            ordering, after, backwards = self._decode_cursor(cursor)
+        
+        # One extra row tells whether there is another page in this direction
+        books = self.book_repo.get_page(ordering, self.page_size + 1, after, backwards)
+        has_more = len(books) > self.page_size
+        books = books[:self.page_size]
+        if backwards:
+            books.reverse()
+        
+        has_next = after is not None if backwards else has_more
+        has_previous = has_more if backwards else after is not None
+        available = self.stock_hold_repo.get_available([book.id for book in books], datetime.now(timezone.utc))
+        books = [AvailableBook(**asdict(book), available=available.get(book.id, 0)) for book in books]
+        return BookPage(
+            books=books,
+            ordering=ordering,
+            next_cursor=self._encode_cursor(ordering, books[-1], False) if books and has_next else None,
+            previous_cursor=self._encode_cursor(ordering, books[0], True) if books and has_previous else None,
+        )
+    
+    @staticmethod
+    def _encode_cursor(ordering: str, book: Book, backwards: bool) -> str:
+        position = [str(getattr(book, ordering.lstrip('-'))), book.id]
+        token = json.dumps({'o': ordering, 'p': position, 'r': backwards}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, Tuple[str, int], bool]:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            value, book_id = data['p']
+            ordering, after, backwards = data['o'], (str(value), int(book_id)), bool(data['r'])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        if ordering not in BOOK_ORDERINGS:
+            raise ValueError("Invalid cursor")
+        return ordering, after, backwards
+
+
+@dataclass
+class BookSearchPage:
+    """One page of search results, most relevant first"""
+    books: List[Book]
+    query: str
+    page: int
+    has_next: bool
+
+
+class SearchBooksUseCase:
+    """Use case for searching books by title and author, ranked and paginated"""
+    
+    def __init__(self, book_repo: IBookRepository, page_size: int = 20):
         self.book_repo = book_repo
+        self.page_size = page_size
     
-    def execute(self) -> List[Book]:
-        """Get all books"""
-        return self.book_repo.get_all()
+    def execute(self, query: str, page: int = 1) -> BookSearchPage:
+        """Get one page of results; the total number of matches is never counted"""
+        if page < 1:
+            raise ValueError("Invalid page")
+        # One extra result tells whether there is a next page
+        books = self.book_repo.search(query, (page - 1) * self.page_size, self.page_size + 1)
+        return BookSearchPage(
+            books=books[:self.page_size],
+            query=query,
+            page=page,
+            has_next=len(books) > self.page_size,
+        )
 
 
 class GetBookByIdUseCase:
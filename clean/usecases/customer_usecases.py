@@ -7,8 +7,10 @@ from decimal import Decimal
 from domain.entities import Customer, Book, Cart, CartItem
 from interfaces.repositories import (
     ICustomerRepository, IBookRepository, 
-    ICartRepository, ICartItemRepository
+    ICartRepository, ICartItemRepository, IStockHoldRepository
 )
+from usecases.book_usecases import ListBooksUseCase, SearchBooksUseCase  # paginated; kept importable from here
+from usecases.stock_usecases import ReserveStockUseCase
 
 
 class RegisterCustomerUseCase:
@@ -46,28 +48,6 @@ class LoginCustomerUseCase:
         return self.customer_repo.authenticate(email, password)
 
 
-class ListBooksUseCase:
-    """Use case for listing all books"""
-    
-    def __init__(self, book_repo: IBookRepository):
-        self.book_repo = book_repo
-    
-    def execute(self) -> List[Book]:
-        """Get all books"""
-        return self.book_repo.get_all()
-
-
-class SearchBooksUseCase:
-    """Use case for searching books"""
-    
-    def __init__(self, book_repo: IBookRepository):
-        self.book_repo = book_repo
-    
-    def execute(self, query: str) -> List[Book]:
-        """Search books"""
-        return self.book_repo.search(query)
-
-
 class GetBookUseCase:
     """Use case for getting a single book"""
     
@@ -80,50 +60,37 @@ class GetBookUseCase:
 
 
 class AddToCartUseCase:
-    """Use case for adding a book to cart"""
+    """Use case for adding a book to cart; the copies are held for the cart
+    (see ReserveStockUseCase) in the same transaction as the item is written"""
     
     def __init__(
         self, 
         cart_repo: ICartRepository,
         cart_item_repo: ICartItemRepository,
-        book_repo: IBookRepository
+        book_repo: IBookRepository,
+        reserve_stock: ReserveStockUseCase
     ):
         self.cart_repo = cart_repo
         self.cart_item_repo = cart_item_repo
         self.book_repo = book_repo
+        self.reserve_stock = reserve_stock
     
     def execute(self, customer_id: int, book_id: int, quantity: int = 1) -> CartItem:
         """Add book to customer's cart"""
+        if quantity < 1:
+            raise ValueError("Quantity must be greater than 0")
+        
         # Get or create cart
         cart = self.cart_repo.get_or_create(customer_id)
         
-        # Get book to check availability
+        # Get book to check it exists
         book = self.book_repo.get_by_id(book_id)
         if not book:
             raise ValueError("Book not found")
         
-        # Check if item already in cart
-        existing_item = self.cart_item_repo.get_by_cart_and_book(cart.id, book_id)
-        
-        if existing_item:
-            # Update quantity
-            new_quantity = existing_item.quantity + quantity
-            if not book.can_order(new_quantity):
-                raise ValueError(f"Only {book.stock} items available")
-            existing_item.quantity = new_quantity
-            return self.cart_item_repo.update(existing_item)
-        else:
-            # Create new cart item
-            if not book.can_order(quantity):
-                raise ValueError(f"Only {book.stock} items available")
-            
-            cart_item = CartItem(
-                id=None,
-                cart_id=cart.id,
-                book_id=book_id,
-                quantity=quantity
-            )
-            return self.cart_item_repo.create(cart_item)
+        # Add to the item already in the cart, or create it, holding the copies;
+        # raises if they are not available
+        return self.reserve_stock.add_to_cart(cart.id, book_id, quantity)
 
 
 class ViewCartUseCase:
@@ -178,12 +145,17 @@ class ViewCartUseCase:
 class RemoveFromCartUseCase:
     """Use case for removing item from cart"""
     
-    def __init__(self, cart_item_repo: ICartItemRepository):
+    def __init__(self, cart_item_repo: ICartItemRepository, stock_hold_repo: IStockHoldRepository):
         self.cart_item_repo = cart_item_repo
+        self.stock_hold_repo = stock_hold_repo
     
     def execute(self, cart_item_id: int) -> None:
-        """Remove item from cart"""
+        """Remove item from cart and release its hold"""
+        cart_item = self.cart_item_repo.get_by_id(cart_item_id)
+        if not cart_item:
+            return
         self.cart_item_repo.delete(cart_item_id)
+        self.stock_hold_repo.release(cart_item.cart_id, [cart_item.book_id])
 
 
 class ClearCartUseCase:
@@ -192,16 +164,19 @@ class ClearCartUseCase:
     def __init__(
         self,
         cart_repo: ICartRepository,
-        cart_item_repo: ICartItemRepository
+        cart_item_repo: ICartItemRepository,
+        stock_hold_repo: IStockHoldRepository
     ):
         self.cart_repo = cart_repo
         self.cart_item_repo = cart_item_repo
+        self.stock_hold_repo = stock_hold_repo
     
     def execute(self, customer_id: int) -> None:
-        """Clear all items from customer's cart"""
+        """Clear all items from customer's cart and release their holds"""
         cart = self.cart_repo.get_by_customer_id(customer_id)
         if cart:
             self.cart_item_repo.clear_cart(cart.id)
+            self.stock_hold_repo.release(cart.id)
 
 
 class UpdateCartItemQuantityUseCase:
@@ -210,10 +185,10 @@ class UpdateCartItemQuantityUseCase:
     def __init__(
         self,
         cart_item_repo: ICartItemRepository,
-        book_repo: IBookRepository
+        reserve_stock: ReserveStockUseCase
     ):
         self.cart_item_repo = cart_item_repo
-        self.book_repo = book_repo
+        self.reserve_stock = reserve_stock
     
     def execute(self, cart_item_id: int, quantity: int) -> None:
         """Update quantity of cart item"""
@@ -225,10 +200,8 @@ class UpdateCartItemQuantityUseCase:
         if not cart_item:
             raise ValueError("Cart item not found")
         
-        # Get book to check stock
-        book = self.book_repo.get_by_id(cart_item.book_id)
-        if not book or not book.can_order(quantity):
-            raise ValueError(f"Only {book.stock if book else 0} items available")
+        # Hold the new quantity; raises if the copies are not available
+        self.reserve_stock.execute(cart_item.cart_id, cart_item.book_id, quantity)
         
         # Update quantity
         cart_item.quantity = quantity
@@ -0,0 +1,57 @@
+"""Use cases for stock reservations"""
+from datetime import datetime, timedelta, timezone
+from domain.entities import CartItem, StockHold
+from interfaces.repositories import IStockHoldRepository
+
+DEFAULT_HOLD_TTL = timedelta(minutes=15)
+
+
+class ReserveStockUseCase:
+    """Use case for holding copies of a book for a cart.
+
+    A hold sets the cart's quantity of a book aside for `hold_ttl` from its last
+    change. Availability is the stock minus the active holds, so an abandoned
+    cart frees its copies when its holds expire, without anything having to
+    release them, and no row stays locked while a customer shops.
+    """
+
+    def __init__(self, stock_hold_repo: IStockHoldRepository, hold_ttl: timedelta = DEFAULT_HOLD_TTL):
+        self.stock_hold_repo = stock_hold_repo
+        self.hold_ttl = hold_ttl
+
+    def execute(self, cart_id: int, book_id: int, quantity: int) -> StockHold:
+        """Hold `quantity` copies for the cart, replacing its previous hold on the book"""
+        now = datetime.now(timezone.utc)
+        hold = StockHold(
+            id=None,
+            cart_id=cart_id,
+            book_id=book_id,
+            quantity=quantity,
+            expires_at=now + self.hold_ttl
+        )
+        available = self.stock_hold_repo.place(hold, now)
+        if available < quantity:
+            raise ValueError(f"Only {available} items available")
+        return hold
+    
+    def add_to_cart(self, cart_id: int, book_id: int, quantity: int) -> CartItem:
+        """Add `quantity` copies to the cart's item for the book and hold its new
+        quantity, both or neither"""
+        now = datetime.now(timezone.utc)
+        available, cart_item = self.stock_hold_repo.add_to_cart(
+            cart_id, book_id, quantity, now + self.hold_ttl, now
+        )
+        if cart_item is None:
+            raise ValueError(f"Only {available} items available")
+        return cart_item
+
+
+class ReleaseExpiredHoldsUseCase:
+    """Use case for deleting expired holds (they no longer count anyway)"""
+
+    def __init__(self, stock_hold_repo: IStockHoldRepository):
+        self.stock_hold_repo = stock_hold_repo
+
+    def execute(self) -> int:
+        """Delete expired holds; returns how many"""
+        return self.stock_hold_repo.release_expired(datetime.now(timezone.utc))
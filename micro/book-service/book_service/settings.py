@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'book_service.tracing.TracingMiddleware',
+    'book_service.db_routing.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -87,12 +89,59 @@ DATABASES = {
     }
 }
 
+# Read replicas of default (see book_service/db_routing.py): add each to DATABASES
+# with 'TEST': {'MIRROR': 'default'} and list its alias in REPLICAS. Book reads then
+# go to a replica at most MAX_LAG seconds behind (checked every LAG_CHECK_INTERVAL
+# seconds), except in transactions and in requests that write books.
+DATABASE_ROUTERS = ['book_service.db_routing.ReplicaRouter']
+REPLICA_ROUTING = {
+    'REPLICAS': [],
+    'MAX_LAG': 5,
+    'LAG_CHECK_INTERVAL': 5,
+}
+
+# Binary catalogue snapshot written by `manage.py publish_catalog_snapshot` and
+# memory-mapped by the gateway on the same host (see books/snapshot.py).
+CATALOG_SNAPSHOT_PATH = BASE_DIR / 'catalog.snapshot'
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-    ]
+        'book_service.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'book_service.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Tracing: one JSON line per request is appended to trace.log (see book_service/tracing.py)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'trace': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'trace_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'trace.log',
+            'formatter': 'trace',
+        },
+    },
+    'loggers': {
+        'tracing': {
+            'handlers': ['trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -0,0 +1,128 @@
+"""Lightweight per-request tracing.
+
+Every request gets an id, taken from the ``X-Request-ID`` header or generated,
+which is echoed back and forwarded on calls to other services. Named timing
+spans (DB queries, downstream calls, ...) are collected while the request runs
+and, when the response goes out, returned in a ``Server-Timing`` header and
+written as one JSON line to the ``tracing`` logger (see ``LOGGING`` in settings).
+"""
+import contextvars
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+SERVICE_NAME = 'book'
+
+logger = logging.getLogger('tracing')
+_current_trace = contextvars.ContextVar('trace', default=None)
+
+
+class Trace:
+    def __init__(self, request_id):
+        self.request_id = request_id
+        # span name -> [total duration in ms, count]
+        self.spans = {}
+
+    def add(self, name, duration_ms, count=1):
+        span = self.spans.setdefault(name, [0.0, 0])
+        span[0] += duration_ms
+        span[1] += count
+
+    def server_timing(self, total_ms):
+        entries = [
+            f'{name};dur={duration:.1f};desc="{count}x"'
+            for name, (duration, count) in self.spans.items()
+        ]
+        entries.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(entries)
+
+
+def current_request_id():
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def record(name, duration_ms, count=1):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, duration_ms, count)
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+def _time_query(execute, sql, params, many, context):
+    with span('db'):
+        return execute(sql, params, many, context)
+
+
+def _install_query_timer(sender, connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+connection_created.connect(_install_query_timer)
+
+
+class TracingMiddleware:
+    """Must be first in ``MIDDLEWARE`` so ``total`` covers the whole request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trace, token, start = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_trace.reset(token)
+        return self._finish(request, response, trace, start)
+
+    async def __acall__(self, request):
+        trace, token, start = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_trace.reset(token)
+        return self._finish(request, response, trace, start)
+
+    def _start(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        trace = Trace(request_id)
+        request.request_id = request_id
+        return trace, _current_trace.set(trace), time.perf_counter()
+
+    def _finish(self, request, response, trace, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        response.headers[REQUEST_ID_HEADER] = trace.request_id
+        response.headers['Server-Timing'] = trace.server_timing(total_ms)
+        logger.info(json.dumps({
+            'ts': time.time(),
+            'request_id': trace.request_id,
+            'service': SERVICE_NAME,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'spans': {name: round(duration, 2) for name, (duration, _) in trace.spans.items()},
+        }))
+        return response
@@ -0,0 +1,174 @@
+"""In-memory prefix autocomplete for book titles and authors.
+
+Every distinct title and author is normalised (lower-cased, Vietnamese diacritics
+folded) and indexed at each word start, so ``pragm`` finds "The Pragmatic
+Programmer". Positions are kept in two sorted arrays of packed
+``(text id, offset)`` integers, searched with ``bisect``: one for matches at the
+start of the text, preferred, and one for matches at a later word. A lookup is
+O(log n + limit) and never touches the database.
+
+The index is built on first use. It is marked stale when a title or author is
+saved or a book deleted in this process, and every ``refresh_interval`` seconds
+a version check (count, max id, max text_updated_at) catches changes made by
+other processes; stock and price updates leave it alone. The rebuild then runs
+in a background thread while the previous index keeps serving.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from django.db import connections
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from .models import Book
+
+logger = logging.getLogger(__name__)
+
+MAX_OFFSET = 255  # offsets are packed in the low 8 bits
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize(text):
+    # 'đ' is a letter of its own, not a 'd' with a combining mark
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
+class _Snapshot:
+    """Immutable index over one state of the catalogue."""
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.texts = []        # normalised text per text id
+        self.suggestions = []  # (field, display text, book id) per text id
+        seen = set()
+        for book_id, title, author in rows:
+            for field, text in (('title', title), ('author', author)):
+                key = (field, normalize(text))
+                if key[1] and key not in seen:
+                    seen.add(key)
+                    self.texts.append(key[1])
+                    self.suggestions.append((field, text, book_id))
+
+        starts, words = [], []
+        for text_id, text in enumerate(self.texts):
+            starts.append(text_id << 8)
+            words.extend(
+                text_id << 8 | offset
+                for offset in range(1, min(len(text), MAX_OFFSET + 1))
+                if text[offset - 1] == ' '
+            )
+        self.starts = array('Q', sorted(starts, key=self._key))
+        self.words = array('Q', sorted(words, key=self._key))
+
+    def _key(self, position):
+        return self.texts[position >> 8][position & 0xff:]
+
+    def suggest(self, prefix, limit):
+        found = []
+        seen = set()
+        for positions in (self.starts, self.words):
+            index = bisect_left(positions, prefix, key=self._key)
+            while index < len(positions) and len(found) < limit:
+                position = positions[index]
+                if not self._key(position).startswith(prefix):
+                    break
+                text_id = position >> 8
+                if text_id not in seen:
+                    seen.add(text_id)
+                    field, text, book_id = self.suggestions[text_id]
+                    found.append({'field': field, 'text': text, 'book_id': book_id if field == 'title' else None})
+                index += 1
+        return found
+
+
+def catalogue_version():
+    """Changes with every insert, delete and update of a book."""
+    return tuple(Book.objects.aggregate(count=Count('id'), last_id=Max('id'), last_modified=Max('updated_at')).values())
+
+
+def index_version():
+    """Changes with inserts, deletes and title or author changes: what the index holds."""
+    return tuple(
+        Book.objects.aggregate(count=Count('id'), last_id=Max('id'), last_text=Max('text_updated_at')).values()
+    )
+
+
+class AutocompleteIndex:
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._stale = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        return self._current().suggest(prefix, limit)
+
+    def invalidate(self):
+        self._stale = True
+
+    def _current(self):
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build()
+                    self._checked_at = time.monotonic()
+        elif self._stale or time.monotonic() - self._checked_at > self.refresh_interval:
+            self._schedule_refresh()
+        return self._snapshot
+
+    def _build(self):
+        start = time.perf_counter()
+        version = index_version()
+        rows = Book.objects.order_by('id').values_list('id', 'title', 'author').iterator(chunk_size=5000)
+        snapshot = _Snapshot(rows, version)
+        logger.info('Autocomplete index built: %d texts in %.0fms',
+                    len(snapshot.texts), (time.perf_counter() - start) * 1000)
+        return snapshot
+
+    def _schedule_refresh(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='autocomplete-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            stale, self._stale = self._stale, False
+            if stale or index_version() != self._snapshot.version:
+                self._snapshot = self._build()
+        except Exception:
+            logger.warning('Autocomplete refresh failed, keeping the previous index', exc_info=True)
+        finally:
+            self._checked_at = time.monotonic()
+            self._refreshing = False
+            # This thread's own database connections
+            connections.close_all()
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def _on_book_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'author'} & set(update_fields):
+        autocomplete_index.invalidate()
+
+
+def _on_book_deleted(sender, instance, **kwargs):
+    autocomplete_index.invalidate()
+
+
+def connect_signals():
+    post_save.connect(_on_book_saved, sender=Book, dispatch_uid='books.autocomplete.saved')
+    post_delete.connect(_on_book_deleted, sender=Book, dispatch_uid='books.autocomplete.deleted')
@@ -0,0 +1,52 @@
+"""ETag / Last-Modified validators for the book endpoints, used with Django's
+``condition`` decorator so unchanged resources are answered with 304 before
+any serialization happens."""
+import hashlib
+
+from rest_framework.exceptions import NotFound, ValidationError
+
+from .fastpath import RowPlan
+from .models import Book
+from .pagination import KeysetPagination
+from .serializers import BookSerializer
+
+
+def catalog_page(request):
+    """``(paginator, plan, rows)`` of the requested page; rows are ``values_list`` tuples
+    of the plan's columns, then those of the cursor and the ETag."""
+    # Cached on the request: the ETag and the view need the same page
+    if not hasattr(request, '_catalog_page'):
+        paginator = KeysetPagination()
+        plan = RowPlan.for_serializer(BookSerializer(context={'request': request}))
+        columns = plan.query_columns(paginator.get_ordering(request).lstrip('-'), 'id', 'updated_at')
+        rows = paginator.paginate_queryset(Book.objects.values_list(*columns, named=True), request)
+        request._catalog_page = paginator, plan, rows
+    return request._catalog_page
+
+
+def catalog_etag(request, *args, **kwargs):
+    try:
+        paginator, _, books = catalog_page(request)
+    except (NotFound, ValidationError):
+        # Left to the view, which answers 404 / 400
+        return None
+    # Rows cannot change without bumping updated_at; the cursors also cover rows
+    # appearing or disappearing right after the page
+    parts = [paginator.page.ordering, paginator.page.next_cursor or '', paginator.page.previous_cursor or '']
+    parts.extend(f'{book.id}-{book.updated_at.timestamp():.6f}' for book in books)
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
+def book_last_modified(request, book_id, *args, **kwargs):
+    if not hasattr(request, '_book_last_modified'):
+        request._book_last_modified = (
+            Book.objects.filter(id=book_id).values_list('updated_at', flat=True).first()
+        )
+    return request._book_last_modified
+
+
+def book_etag(request, book_id, *args, **kwargs):
+    last_modified = book_last_modified(request, book_id)
+    if last_modified is None:
+        return None
+    return f'{book_id}-{last_modified.timestamp():.6f}'
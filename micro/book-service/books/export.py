@@ -0,0 +1,67 @@
+"""Streaming catalogue export (NDJSON or CSV).
+
+Books are read in keyset chunks (``WHERE id > last id ORDER BY id LIMIT n``), so
+neither the database driver nor this process ever holds more than one chunk,
+whatever the catalogue size; ``QuerySet.iterator()`` would not guarantee that on
+MySQL, where the driver buffers the whole result set. Each chunk is encoded and
+sent as soon as it is read.
+
+Chunks are separate queries, so rows changed during a long export may appear
+in their old or new state; every book present for the whole export appears once.
+"""
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+
+from .models import Book
+
+EXPORT_FIELDS = ['id', 'title', 'author', 'price', 'stock']
+CHUNK_SIZE = 2000
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def iter_book_rows(chunk_size=CHUNK_SIZE):
+    """Yields lists of up to ``chunk_size`` value tuples, in id order."""
+    last_id = 0
+    while True:
+        rows = list(
+            Book.objects.filter(id__gt=last_id).order_by('id').values_list(*EXPORT_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def ndjson_chunks(chunks):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False, default=str) + '\n'
+            for row in rows
+        )
+
+
+def csv_chunks(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty catalogue
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(export_format, chunk_size=CHUNK_SIZE):
+    encode = ndjson_chunks if export_format == 'ndjson' else csv_chunks
+    response = StreamingHttpResponse(encode(iter_book_rows(chunk_size)), content_type=FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="books.{export_format}"'
+    return response
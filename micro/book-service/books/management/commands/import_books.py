@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from books.importer import BATCH_SIZE, FORMATS, detect_format, import_books
+
+
+class Command(BaseCommand):
+    help = 'Import books from a CSV or JSONL file (columns title, author, price, stock), creating or updating by title and author'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS,
+                            help='file format (default: from the extension, .jsonl/.ndjson or csv)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='books per transaction')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or detect_format(path)
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+        with stream:
+            stats = import_books(stream, file_format, options['batch_size'], on_chunk=self.report_progress)
+
+        for line, message in stats.errors:
+            self.stderr.write(f'line {line}: {message}')
+        if stats.invalid > len(stats.errors):
+            self.stderr.write(f'... and {stats.invalid - len(stats.errors)} more invalid rows')
+        self.stdout.write(self.style.SUCCESS(
+            f'Read {stats.read} rows in {stats.elapsed:.1f}s ({stats.rows_per_second:.0f} rows/s): '
+            f'{stats.created} created, {stats.updated} updated, {stats.unchanged} unchanged, '
+            f'{stats.duplicates} duplicates, {stats.invalid} invalid'
+        ))
+
+    def report_progress(self, stats):
+        self.stdout.write(
+            f'{stats.read} rows, {stats.created} created, {stats.updated} updated '
+            f'({stats.rows_per_second:.0f} rows/s)'
+        )
@@ -0,0 +1,44 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from books.autocomplete import catalogue_version
+from books.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Publish the binary catalogue snapshot the gateway memory-maps, once or whenever the catalogue changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=getattr(settings, 'CATALOG_SNAPSHOT_PATH', 'catalog.snapshot'),
+                            help='snapshot file (default: CATALOG_SNAPSHOT_PATH)')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='keep running, checking the catalogue for changes every this many seconds '
+                                 "(less than the gateway's CATALOG_SNAPSHOT MAX_AGE); by default publish once and exit")
+
+    def handle(self, *args, **options):
+        published = None
+        while True:
+            current = catalogue_version()
+            if current == published:
+                # Still current: readers judge the snapshot's age by its mtime
+                try:
+                    os.utime(options['path'])
+                except FileNotFoundError:
+                    # Removed since: publish it again
+                    published = None
+            if current != published:
+                start = time.perf_counter()
+                version, count = write_snapshot(options['path'])
+                self.stdout.write(
+                    f"Published snapshot {version}: {count} books, {os.path.getsize(options['path'])} bytes "
+                    f'in {(time.perf_counter() - start) * 1000:.0f}ms'
+                )
+                published = current
+            if not options['interval']:
+                break
+            # Do not hold a connection open between checks
+            connections.close_all()
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:12
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_existing_books(apps, schema_editor):
+    # Existing books in id order, so a first pull from since=0 returns them all
+    Book = apps.get_model('books', 'Book')
+    ChangeSequence = apps.get_model('books', 'ChangeSequence')
+    Book.objects.update(change_seq=F('id'))
+    ChangeSequence.objects.create(id=1, value=Book.objects.aggregate(last=Max('id'))['last'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'book_change_sequence',
+            },
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(number_existing_books, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['change_seq'], name='book_change_seq_idx'),
+        ),
+    ]
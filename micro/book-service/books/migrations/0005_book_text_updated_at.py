@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_change_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='text_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['text_updated_at'], name='book_text_updated_at_idx'),
+        ),
+    ]
@@ -1,4 +1,52 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models import BigIntegerField, Case, F, Value, When
+
+
+class ChangeSequence(models.Model):
+    """Single-row counter numbering every write to a book (``Book.change_seq``).
+
+    ``allocate()`` increments the row inside the writing transaction, which keeps
+    it locked until that transaction ends: the next writer waits, so numbers
+    become visible in the order they were handed out, and a reader that has seen
+    ``n`` has seen everything before it (rolled back numbers are just skipped).
+    Every writer waits on that one row, so writers number their books with
+    ``stamp()`` as the last statement before commit, after their own writes.
+    """
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'book_change_sequence'
+
+    @classmethod
+    def allocate(cls, count=1):
+        """Reserve ``count`` consecutive numbers; returns the first."""
+        if not transaction.get_connection().in_atomic_block:
+            raise transaction.TransactionManagementError(
+                'Change sequence numbers must be allocated in the transaction that writes them'
+            )
+        if not cls.objects.filter(id=1).update(value=F('value') + count):
+            cls.objects.create(id=1, value=count)
+        return cls.objects.values_list('value', flat=True).get(id=1) - count + 1
+
+    @classmethod
+    def stamp(cls, book_ids, batch_size=500):
+        """Set ``change_seq`` of the books ``book_ids`` to newly allocated numbers.
+
+        Meant as the last statement of the transaction that wrote the books: the
+        counter row stays locked from here to the commit. Returns the last number.
+        """
+        book_ids = list(dict.fromkeys(book_ids))
+        if not book_ids:
+            return None
+        first_seq = cls.allocate(len(book_ids))
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start:start + batch_size]
+            Book.objects.filter(id__in=batch).update(change_seq=Case(
+                *(When(id=book_id, then=Value(first_seq + start + i)) for i, book_id in enumerate(batch)),
+                output_field=BigIntegerField(),
+            ))
+        return first_seq + len(book_ids) - 1
 
 
 class Book(models.Model):
@@ -6,9 +54,45 @@ class Book(models.Model):
     author = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set by ChangeSequence.stamp() after every insert / update, by save() and
+    # by each update() / bulk write; GET /api/books/changes/?since= reads it
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    # Set by save() when the title or author may have changed (updated_at also
+    # moves with every stock change); the autocomplete index version reads it
+    text_updated_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'books'
+        # id completes each index so keyset pages ((title, id) > (t, i), see
+        # pagination.py) are range scans; updated_at and text_updated_at serve
+        # MAX() in the catalogue version checks; change_seq the change feed
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['price', 'id'], name='book_price_id_idx'),
+            models.Index(fields=['updated_at'], name='book_updated_at_idx'),
+            models.Index(fields=['change_seq'], name='book_change_seq_idx'),
+            models.Index(fields=['text_updated_at'], name='book_text_updated_at_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        book = super().from_db(db, field_names, values)
+        # Title and author as loaded, for save() to tell whether they changed
+        book._loaded_text = (book.__dict__.get('title'), book.__dict__.get('author'))
+        return book
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'author'} & set(update_fields):
+            if (self.title, self.author) != getattr(self, '_loaded_text', None):
+                self.text_updated_at = timezone.now()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'text_updated_at'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.change_seq = ChangeSequence.stamp([self.pk])
+        self._loaded_text = (self.title, self.author)
 
     def __str__(self):
         return self.title
@@ -0,0 +1,87 @@
+"""Binary catalogue snapshot for readers on the same host (the gateway).
+
+The snapshot is one file that readers ``mmap`` read-only: every worker process
+maps the same pages of the OS page cache, so the catalogue is held once per host,
+and a book is found by id with a binary search over the index without decoding
+anything else. Layout, little-endian:
+
+- header (``HEADER``): magic ``b'BOOKSNAP'``, format version, reserved, book
+  count, snapshot version, offset of the id index
+- one record per book, in id order: ``RECORD`` (price in cents, stock, title and
+  author byte lengths) followed by the UTF-8 title and author
+- the id index, 8-byte aligned: ``count`` sorted ``uint64`` book ids, then
+  ``count`` ``uint64`` file offsets of their records
+
+``version`` grows with every publish (microseconds since the epoch). A snapshot
+is written to a temporary file next to ``path`` and renamed over it, so a reader
+opens either the previous file or the complete new one, and its mapping of the
+previous file stays valid until it lets go of it.
+
+The file's modification time is when it was last known to match the catalogue:
+``publish_catalog_snapshot --interval`` touches it after every check that finds
+nothing changed, and readers stop using a snapshot older than their maximum age.
+"""
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from .models import Book
+
+MAGIC = b'BOOKSNAP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')  # magic, format version, reserved, count, version, index offset
+RECORD = struct.Struct('<qiHH')     # price in cents, stock, title length, author length
+
+
+def read_version(path):
+    """Version of the snapshot at ``path``; 0 when there is none (or it is not one)."""
+    try:
+        with open(path, 'rb') as f:
+            magic, _, _, _, version, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+def write_snapshot(path, chunk_size=5000):
+    """Write the whole catalogue to ``path``, replacing it atomically; returns ``(version, count)``."""
+    path = os.fspath(path)
+    version = max(time.time_ns() // 1000, read_version(path) + 1)
+    ids, offsets = array('Q'), array('Q')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(bytes(HEADER.size))
+            offset = HEADER.size
+            rows = Book.objects.order_by('id').values_list('id', 'price', 'stock', 'title', 'author')
+            for book_id, price, stock, title, author in rows.iterator(chunk_size=chunk_size):
+                title, author = title.encode(), author.encode()
+                ids.append(book_id)
+                offsets.append(offset)
+                f.write(RECORD.pack(int(price * 100), stock, len(title), len(author)))
+                f.write(title)
+                f.write(author)
+                offset += RECORD.size + len(title) + len(author)
+
+            padding = -offset % 8
+            f.write(bytes(padding))
+            if sys.byteorder == 'big':
+                ids.byteswap()
+                offsets.byteswap()
+            f.write(ids.tobytes())
+            f.write(offsets.tobytes())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(ids), version, offset + padding))
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file readable by its owner only; readers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return version, len(ids)
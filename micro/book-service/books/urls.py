@@ -3,6 +3,11 @@ from . import views
 
 urlpatterns = [
     path('', views.list_books, name='list_books'),
+    path('batch/', views.batch_books, name='batch_books'),
+    path('changes/', views.book_changes, name='book_changes'),
+    path('autocomplete/', views.autocomplete, name='autocomplete'),
+    path('export/', views.export_books, name='export_books'),
+    path('stock/', views.batch_update_stock, name='batch_update_stock'),
     path('<int:book_id>/', views.get_book, name='get_book'),
     path('<int:book_id>/stock/', views.update_stock, name='update_stock'),
 ]
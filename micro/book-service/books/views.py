@@ -1,36 +1,169 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Value, When
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import Book
-from .serializers import BookSerializer
+from .models import Book, ChangeSequence
+from .serializers import BookSerializer, StockChangeSerializer
+from .autocomplete import DEFAULT_LIMIT as AUTOCOMPLETE_LIMIT, MAX_LIMIT as AUTOCOMPLETE_MAX_LIMIT, autocomplete_index
+from .export import FORMATS as EXPORT_FORMATS, export_response
+from .fastpath import RowPlan
+from .fieldsets import selected_columns
+from .conditional import catalog_etag, catalog_page, book_etag, book_last_modified
+
+MAX_BATCH_SIZE = 500
+CHANGES_LIMIT = 500
+CHANGES_MAX_LIMIT = 5000
 
 
+@condition(etag_func=catalog_etag)
 @api_view(['GET'])
 def list_books(request):
-    books = Book.objects.all()
-    serializer = BookSerializer(books, many=True)
-    return Response(serializer.data)
+    # Rows as tuples through a precompiled plan instead of a serializer per book
+    paginator, plan, rows = catalog_page(request)
+    return paginator.get_paginated_response(plan.represent(rows))
 
 
+@condition(etag_func=book_etag, last_modified_func=book_last_modified)
 @api_view(['GET'])
 def get_book(request, book_id):
+    columns = selected_columns(BookSerializer(context={'request': request}))
     try:
-        book = Book.objects.get(id=book_id)
-        serializer = BookSerializer(book)
+        book = Book.objects.only(*columns).get(id=book_id)
+        serializer = BookSerializer(book, context={'request': request})
         return Response(serializer.data)
     except Book.DoesNotExist:
         return Response({'error': 'Book not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['GET'])
+def batch_books(request):
+    ids_param = request.query_params.get('ids', '')
+    try:
+        book_ids = {int(book_id) for book_id in ids_param.split(',') if book_id.strip()}
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of integers'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    if len(book_ids) > MAX_BATCH_SIZE:
+        return Response({'error': f'At most {MAX_BATCH_SIZE} ids per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    plan = RowPlan.for_serializer(BookSerializer(context={'request': request}))
+    rows = Book.objects.filter(id__in=book_ids).values_list(*plan.columns) if book_ids else []
+    return Response(plan.represent(rows))
+
+
+@api_view(['GET'])
+def book_changes(request):
+    """Books inserted or updated after change sequence number ``since``, oldest change first.
+
+    ``next_since`` is the sequence number of the last book returned (``since`` if
+    none): pass it as the next ``since``; ``has_more`` says whether to ask again
+    right away. A book changed twice is returned once, as it is now. ``latest``
+    is the newest number written, where a consumer without a cursor can start
+    (``limit=0`` returns just that). Deleted books are not reported.
+    """
+    try:
+        since = int(request.query_params.get('since', 0))
+        limit = min(max(int(request.query_params.get('limit', CHANGES_LIMIT)), 0), CHANGES_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'since and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    plan = RowPlan.for_serializer(BookSerializer(context={'request': request}))
+    # One row past the limit tells whether there are more
+    rows = list(
+        Book.objects.filter(change_seq__gt=since).order_by('change_seq')
+        .values_list(*plan.query_columns('change_seq'), named=True)[:limit + 1]
+    )
+    has_more, rows = len(rows) > limit, rows[:limit]
+    return Response({
+        'next_since': rows[-1].change_seq if rows else since,
+        'has_more': has_more,
+        'latest': Book.objects.aggregate(latest=Max('change_seq'))['latest'] or 0,
+        'results': plan.represent(rows),
+    })
+
+
+@api_view(['GET'])
+def autocomplete(request):
+    query = request.query_params.get('q', '')
+    try:
+        limit = min(max(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)), 1), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'query': query, 'suggestions': autocomplete_index.suggest(query, limit)})
+
+
+# Plain Django view: DRF would treat ?format= as a renderer override
+@require_GET
+def export_books(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    return export_response(export_format)
+
+
 @api_view(['PUT'])
 def update_stock(request, book_id):
-    try:
-        book = Book.objects.get(id=book_id)
-        stock_change = request.data.get('stock_change', 0)
-        book.stock += stock_change
-        book.save()
-        serializer = BookSerializer(book)
-        return Response(serializer.data)
-    except Book.DoesNotExist:
+    stock_change = request.data.get('stock_change', 0)
+    # Applied by the database (stock = stock + change), so concurrent updates are not lost.
+    # update() skips auto_now and save(), hence updated_at and change_seq.
+    with transaction.atomic():
+        updated = Book.objects.filter(id=book_id).update(stock=F('stock') + stock_change, updated_at=timezone.now())
+        if updated:
+            ChangeSequence.stamp([book_id])
+    if not updated:
         return Response({'error': 'Book not found'}, status=status.HTTP_404_NOT_FOUND)
+    serializer = BookSerializer(Book.objects.get(id=book_id))
+    return Response(serializer.data)
+
+
+@api_view(['POST'])
+def batch_update_stock(request):
+    """Apply ``{"changes": [{"book_id", "stock_change"}, ...]}`` all or nothing.
+
+    One UPDATE adds every change database-side and one SELECT reads the new
+    levels, in a single transaction; if a book is missing or would go below
+    zero, the whole batch is rolled back.
+    """
+    changes = request.data.get('changes') if hasattr(request.data, 'get') else None
+    serializer = StockChangeSerializer(data=changes, many=True, allow_empty=False)
+    if not serializer.is_valid():
+        return Response({'error': 'changes must be a non-empty list of {book_id, stock_change}',
+                         'details': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    changes = defaultdict(int)
+    for change in serializer.validated_data:
+        changes[change['book_id']] += change['stock_change']
+    if len(changes) > MAX_BATCH_SIZE:
+        return Response({'error': f'At most {MAX_BATCH_SIZE} books per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        stock_change = Case(
+            *(When(id=book_id, then=Value(change)) for book_id, change in changes.items()),
+            output_field=IntegerField(),
+        )
+        Book.objects.filter(id__in=changes).update(stock=F('stock') + stock_change, updated_at=timezone.now())
+        books = list(Book.objects.filter(id__in=changes).order_by('id'))
+
+        missing = sorted(set(changes) - {book.id for book in books})
+        if missing:
+            transaction.set_rollback(True)
+            return Response({'error': 'Book not found', 'book_ids': missing}, status=status.HTTP_404_NOT_FOUND)
+        insufficient = [book.id for book in books if book.stock < 0]
+        if insufficient:
+            transaction.set_rollback(True)
+            return Response({'error': 'Insufficient stock', 'book_ids': insufficient},
+                            status=status.HTTP_409_CONFLICT)
+        # Numbered last, so the change sequence row is locked only until the commit
+        ChangeSequence.stamp(changes)
+
+    return Response(BookSerializer(books, many=True).data)
 
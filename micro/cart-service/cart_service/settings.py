@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'cart_service.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -92,7 +93,48 @@ CORS_ALLOW_ALL_ORIGINS = True
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-    ]
+        'cart_service.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'cart_service.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Book service, used to embed book data in cart details
+BOOK_SERVICE_URL = 'http://localhost:8003/api/books'
+BOOK_SERVICE_TIMEOUT = (3.05, 10)
+# Cached books are refreshed from book-service's change feed, pulled at most
+# every BOOK_CHANGES_INTERVAL seconds; the timeout only matters when it is unreachable
+BOOK_CACHE_TIMEOUT = 600
+BOOK_CHANGES_INTERVAL = 1
+
+
+# Tracing: one JSON line per request is appended to trace.log (see cart_service/tracing.py)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'trace': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'trace_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'trace.log',
+            'formatter': 'trace',
+        },
+    },
+    'loggers': {
+        'tracing': {
+            'handlers': ['trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
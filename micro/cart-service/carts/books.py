@@ -0,0 +1,156 @@
+"""Bulk, cached access to book-service for composing cart details.
+
+Cached books are kept fresh from book-service's change feed: at most every
+``BOOK_CHANGES_INTERVAL`` seconds the books changed since the last pull are
+fetched (usually none, a tiny response) and those already cached are replaced,
+so the cache timeout only bounds staleness while the feed cannot be reached.
+A book fetched while a change to it commits may come back as it was; before
+caching fetched books, the changes pulled since the fetch started are applied
+to them, so a pull that went past the change cannot leave it cached.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from cart_service.tracing import REQUEST_ID_HEADER, current_request_id, span
+
+logger = logging.getLogger(__name__)
+
+# Shared keep-alive session for all calls to book-service
+session = requests.Session()
+# All cart details show of a book (sparse fieldset: book-service reads and sends nothing else)
+BOOK_FIELDS = 'id,title,author,price'
+# Must not exceed MAX_BATCH_SIZE in book-service
+BATCH_SIZE = 500
+CHANGES_LIMIT = 500
+
+_sync_lock = threading.Lock()
+_synced_at = None
+# Change feed position the cached books are current with. Per process, not in
+# the cache, which may evict it
+_since = None
+
+
+def _chunks(book_ids):
+    return [book_ids[i:i + BATCH_SIZE] for i in range(0, len(book_ids), BATCH_SIZE)]
+
+
+def _cache_key(book_id):
+    return f'book:{book_id}'
+
+
+def get_books(book_ids):
+    """Return ``{book_id: book}`` for the given ids, from cache or batch calls of
+    at most ``BATCH_SIZE`` ids (book-service rejects bigger batches).
+
+    Books book-service cannot return (unknown id or service down) are simply missing.
+    """
+    book_ids = set(book_ids)
+    if not book_ids:
+        return {}
+
+    sync_changes()
+    since = _since
+    cached = cache.get_many([_cache_key(book_id) for book_id in book_ids])
+    books = {book['id']: book for book in cached.values()}
+    missing = sorted(book_ids - books.keys())
+    if not missing:
+        return books
+
+    fetched = {}
+    for chunk in _chunks(missing):
+        try:
+            with span('book'):
+                response = session.get(
+                    f'{settings.BOOK_SERVICE_URL}/batch/',
+                    params={'ids': ','.join(map(str, chunk)), 'fields': BOOK_FIELDS},
+                    headers={REQUEST_ID_HEADER: current_request_id()},
+                    timeout=settings.BOOK_SERVICE_TIMEOUT,
+                )
+            response.raise_for_status()
+        except requests.RequestException:
+            logger.warning('Could not fetch books %s from book-service', chunk, exc_info=True)
+            continue
+        fetched.update((book['id'], book) for book in response.json())
+
+    _cache_fetched(fetched, since)
+    books.update(fetched)
+    return books
+
+
+def _cache_fetched(books, since):
+    """Cache ``{book_id: book}`` fetched when the change feed was at ``since``,
+    after replacing the books changed since then with the feed's state.
+
+    Holds ``_sync_lock`` so no pull moves the feed in between; if the feed cannot
+    be read, the books are not cached, as nothing would keep them fresh.
+    """
+    if since is None or not books:
+        return
+    with _sync_lock:
+        if _since < since:
+            # The feed went back (catalogue replaced)
+            return
+        try:
+            while since < _since:
+                feed = _pull_changes(since, CHANGES_LIMIT)
+                books.update((book['id'], book) for book in feed['results'] if book['id'] in books)
+                since = feed['next_since']
+                if not feed['has_more']:
+                    break
+        except requests.RequestException:
+            logger.warning('Could not pull book changes from book-service', exc_info=True)
+            return
+        cache.set_many(
+            {_cache_key(book_id): book for book_id, book in books.items()},
+            timeout=settings.BOOK_CACHE_TIMEOUT,
+        )
+
+
+def _pull_changes(since, limit):
+    with span('book'):
+        response = session.get(
+            f'{settings.BOOK_SERVICE_URL}/changes/',
+            params={'since': since, 'limit': limit, 'fields': BOOK_FIELDS},
+            headers={REQUEST_ID_HEADER: current_request_id()},
+            timeout=settings.BOOK_SERVICE_TIMEOUT,
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+def sync_changes():
+    """Replace the cached books changed since the last pull; one caller at a time,
+    at most every ``BOOK_CHANGES_INTERVAL`` seconds."""
+    global _synced_at, _since
+    if _synced_at is not None and time.monotonic() - _synced_at < settings.BOOK_CHANGES_INTERVAL:
+        return
+    if not _sync_lock.acquire(blocking=False):
+        return
+    try:
+        if _since is None:
+            # First pull of this process: follow changes from now on
+            _since = _pull_changes(0, 0)['latest']
+        while True:
+            feed = _pull_changes(_since, CHANGES_LIMIT)
+            if feed['latest'] < _since:
+                # book-service's catalogue was replaced; cached books expire on their own
+                logger.warning('Book change feed went back from %d to %d', _since, feed['latest'])
+                _since = feed['latest']
+                break
+            changed = {_cache_key(book['id']): book for book in feed['results']}
+            # Only refresh what is cached: the cache is not a catalogue copy
+            cached = cache.get_many(list(changed))
+            cache.set_many({key: changed[key] for key in cached}, timeout=settings.BOOK_CACHE_TIMEOUT)
+            _since = feed['next_since']
+            if not feed['has_more']:
+                break
+    except requests.RequestException:
+        logger.warning('Could not pull book changes from book-service', exc_info=True)
+    finally:
+        _synced_at = time.monotonic()
+        _sync_lock.release()
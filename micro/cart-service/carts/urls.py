@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('<int:customer_id>/', views.cart_view, name='cart_view'),
+    path('<int:customer_id>/details/', views.cart_details, name='cart_details'),
     path('items/<int:item_id>/', views.remove_item, name='remove_item'),
     path('items/<int:item_id>/update/', views.update_item, name='update_item'),
 ]
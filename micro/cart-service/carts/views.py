@@ -1,8 +1,11 @@
+from decimal import Decimal
+
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
+from .books import get_books
 
 
 @api_view(['GET', 'POST'])
@@ -34,6 +37,48 @@ def cart_view(request, customer_id):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['GET'])
+def cart_details(request, customer_id):
+    """Cart with book title/price embedded and line/cart totals computed."""
+    cart = Cart.objects.filter(customer_id=customer_id).prefetch_related('items').first()
+    if cart is None:
+        return Response({'customer_id': customer_id, 'items': [], 'total_items': 0, 'total_price': '0.00'})
+
+    cart_items = list(cart.items.all())
+    books = get_books(item.book_id for item in cart_items)
+
+    items = []
+    total_items = 0
+    total_price = Decimal('0.00')
+    for cart_item in cart_items:
+        book = books.get(cart_item.book_id)
+        line_total = None
+        if book:
+            line_total = Decimal(book['price']) * cart_item.quantity
+            total_items += cart_item.quantity
+            total_price += line_total
+        items.append({
+            'id': cart_item.id,
+            'book_id': cart_item.book_id,
+            'quantity': cart_item.quantity,
+            'book': {
+                'id': book['id'],
+                'title': book['title'],
+                'author': book['author'],
+                'price': book['price'],
+            } if book else None,
+            'line_total': f'{line_total:.2f}' if book else None,
+        })
+
+    return Response({
+        'id': cart.id,
+        'customer_id': cart.customer_id,
+        'items': items,
+        'total_items': total_items,
+        'total_price': f'{total_price:.2f}',
+    })
+
+
 @api_view(['DELETE'])
 def remove_item(request, item_id):
     try:
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'customer_service.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -94,7 +95,39 @@ CORS_ALLOW_ALL_ORIGINS = True
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-    ]
+        'customer_service.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'customer_service.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# Tracing: one JSON line per request is appended to trace.log (see customer_service/tracing.py)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'trace': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'trace_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'trace.log',
+            'formatter': 'trace',
+        },
+    },
+    'loggers': {
+        'tracing': {
+            'handlers': ['trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -0,0 +1,15 @@
+from .base import ServiceClient, ServiceError
+from .books import BookClient
+from .carts import CartClient
+from .customers import CustomerClient
+
+# Shared clients: one connection pool per service, reused by every gateway request
+customer_client = CustomerClient.from_settings()
+book_client = BookClient.from_settings()
+cart_client = CartClient.from_settings()
+
+__all__ = [
+    'ServiceClient', 'ServiceError',
+    'CustomerClient', 'BookClient', 'CartClient',
+    'customer_client', 'book_client', 'cart_client',
+]
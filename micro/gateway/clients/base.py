@@ -0,0 +1,214 @@
+import asyncio
+import weakref
+
+import httpx
+import msgpack
+from django.conf import settings
+
+from gateway.tracing import REQUEST_ID_HEADER, current_request_id, record_server_timing, span
+from .singleflight import SingleFlight
+
+
+MSGPACK = 'application/msgpack'
+
+
+class ServiceError(Exception):
+    """Raised when a downstream service answers with an unexpected status code."""
+
+    def __init__(self, service, status_code, payload=None):
+        self.service = service
+        self.status_code = status_code
+        self.payload = payload
+        super().__init__(f'{service} service returned HTTP {status_code}')
+
+
+class ServiceClient:
+    """Base HTTP client for one downstream service.
+
+    Each client keeps a pool of keep-alive connections sized per service, reused
+    across gateway requests: an ``httpx.Client`` for the sync methods and, for the
+    ``a``-prefixed async methods, an ``httpx.AsyncClient`` per event loop.
+
+    ``transport`` selects how calls reach the service behind the same interface:
+
+    - ``'tcp'``: plain HTTP to ``base_url`` (default)
+    - ``'uds'``: HTTP over the Unix socket ``socket_path``, for services running on
+      the same host; skips the loopback TCP stack
+
+    There is no in-process mode: each service is a Django project with its own
+    settings module, and Django allows one per process, so a service's views
+    cannot run inside the gateway.
+
+    ``wire_format`` is ``'msgpack'`` (default) or ``'json'``. With MessagePack the
+    client asks for ``application/msgpack`` responses and sends ``json=`` bodies
+    as MessagePack; responses are decoded by their ``Content-Type`` either way.
+
+    Concurrent identical GETs are coalesced: only one goes upstream and the
+    others share its response (see ``SingleFlight``; counters in ``stats()``).
+
+    Every call forwards the current request id and is timed as a span named after
+    the service; the service's own ``Server-Timing`` spans are folded in as
+    ``<service>.<span>``.
+    """
+
+    service_name = None
+    transports = ('tcp', 'uds')
+    wire_formats = ('msgpack', 'json')
+
+    def __init__(self, base_url, pool_size=10, connect_timeout=3.05, read_timeout=10, retries=0,
+                 coalesce_gets=True, transport='tcp', socket_path=None, wire_format='msgpack'):
+        if transport not in self.transports:
+            raise ValueError(f'Unknown transport {transport!r} for {self.service_name} service')
+        if transport == 'uds' and not socket_path:
+            raise ValueError(f"{self.service_name} service: 'uds' transport needs a socket path")
+        if wire_format not in self.wire_formats:
+            raise ValueError(f'Unknown wire format {wire_format!r} for {self.service_name} service')
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.retries = retries
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.transport = transport
+        self.socket_path = socket_path
+        self.wire_format = wire_format
+        self.client = httpx.Client(timeout=self.timeout, transport=self._build_transport(is_async=False))
+        self._async_clients = weakref.WeakKeyDictionary()
+        self.coalesce_gets = coalesce_gets
+        self.singleflight = SingleFlight()
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.SERVICES[cls.service_name]
+        return cls(
+            base_url=config['BASE_URL'],
+            pool_size=config.get('POOL_SIZE', 10),
+            connect_timeout=config.get('CONNECT_TIMEOUT', 3.05),
+            read_timeout=config.get('READ_TIMEOUT', 10),
+            retries=config.get('RETRIES', 0),
+            coalesce_gets=config.get('COALESCE_GETS', True),
+            transport=config.get('TRANSPORT', 'tcp'),
+            socket_path=config.get('SOCKET'),
+            wire_format=config.get('FORMAT', 'msgpack'),
+        )
+
+    def request(self, method, path, expected=(200,), **kwargs):
+        return self._decode(self.send(method, path, expected, **kwargs))
+
+    def send(self, method, path, expected=(200,), **kwargs):
+        """Like ``request`` but returns the raw response, e.g. to read its headers."""
+        url = f'{self.base_url}{path}'
+        key = self._flight_key(method, url, kwargs) if self._coalesces(method, kwargs) else None
+        kwargs = self._prepare(kwargs)
+        with span(self.service_name):
+            if key:
+                response = self.singleflight.do(key, lambda: self.client.request(method, url, **kwargs))
+            else:
+                response = self.client.request(method, url, **kwargs)
+        self._record_timing(response)
+        if response.status_code not in expected:
+            raise ServiceError(self.service_name, response.status_code, self._decode(response))
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    async def arequest(self, method, path, expected=(200,), **kwargs):
+        return self._decode(await self.asend(method, path, expected, **kwargs))
+
+    async def asend(self, method, path, expected=(200,), **kwargs):
+        url = f'{self.base_url}{path}'
+        client = self._async_client()
+        key = self._flight_key(method, url, kwargs) if self._coalesces(method, kwargs) else None
+        kwargs = self._prepare(kwargs)
+        with span(self.service_name):
+            if key:
+                response = await self.singleflight.ado(key, lambda: client.request(method, url, **kwargs))
+            else:
+                response = await client.request(method, url, **kwargs)
+        self._record_timing(response)
+        if response.status_code not in expected:
+            raise ServiceError(self.service_name, response.status_code, self._decode(response))
+        return response
+
+    async def aget(self, path, **kwargs):
+        return await self.arequest('GET', path, **kwargs)
+
+    async def apost(self, path, **kwargs):
+        return await self.arequest('POST', path, **kwargs)
+
+    async def aput(self, path, **kwargs):
+        return await self.arequest('PUT', path, **kwargs)
+
+    async def adelete(self, path, **kwargs):
+        return await self.arequest('DELETE', path, **kwargs)
+
+    def stats(self):
+        return self.singleflight.stats()
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _async_client(self):
+        # httpx.AsyncClient is bound to the loop it first ran on, so keep one per loop
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, transport=self._build_transport(is_async=True))
+            self._async_clients[loop] = client
+        return client
+
+    def _build_transport(self, is_async):
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        transport_class = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+        return transport_class(limits=limits, retries=self.retries, uds=self.socket_path)
+
+    def _coalesces(self, method, kwargs):
+        return self.coalesce_gets and method == 'GET' and not kwargs.keys() & {'json', 'data', 'content'}
+
+    def _prepare(self, kwargs):
+        headers = dict(kwargs.get('headers') or {})
+        request_id = current_request_id()
+        if request_id:
+            headers[REQUEST_ID_HEADER] = request_id
+        if self.wire_format == 'msgpack':
+            headers.setdefault('Accept', MSGPACK)
+            if 'json' in kwargs:
+                kwargs['content'] = msgpack.packb(kwargs.pop('json'), use_bin_type=True)
+                headers['Content-Type'] = MSGPACK
+        kwargs['headers'] = headers
+        return kwargs
+
+    def _record_timing(self, response):
+        server_timing = response.headers.get('Server-Timing')
+        if server_timing:
+            record_server_timing(self.service_name, server_timing)
+
+    @staticmethod
+    def _flight_key(method, url, kwargs):
+        params = kwargs.get('params') or {}
+        headers = kwargs.get('headers') or {}
+        return (method, url, tuple(sorted(params.items())), tuple(sorted(headers.items())))
+
+    @staticmethod
+    def _decode(response):
+        if response.status_code == 304 or not response.content:
+            return None
+        try:
+            if response.headers.get('Content-Type', '').startswith(MSGPACK):
+                return msgpack.unpackb(response.content, raw=False)
+            return response.json()
+        except ValueError:
+            return None
@@ -0,0 +1,148 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+from .base import ServiceClient
+from .snapshot import CatalogSnapshot
+
+# Must not exceed MAX_BATCH_SIZE in book-service
+BATCH_SIZE = 500
+
+
+class BookClient(ServiceClient):
+    """Client for book-service (``/api/books``).
+
+    With a ``snapshot`` (a ``CatalogSnapshot``), lookups by id are answered from
+    it, as fresh as its last publish, and only books missing from it are fetched.
+    """
+
+    service_name = 'book'
+    snapshot = None
+
+    @classmethod
+    def from_settings(cls):
+        client = super().from_settings()
+        client.snapshot = CatalogSnapshot.from_settings()
+        return client
+
+    def list_books(self, ordering=None, cursor=None, page_size=None, fields=None):
+        """One catalogue page: ``{'results', 'next_cursor', 'previous_cursor'}``."""
+        return self._page(self.get('/', params=self._page_params(ordering, cursor, page_size, fields)))
+
+    def get_book(self, book_id):
+        book = self.snapshot.get(book_id) if self.snapshot else None
+        return book if book is not None else self.get(f'/{book_id}/')
+
+    def get_books(self, book_ids, fields=None):
+        """Fetch many books in one call per batch; returns a dict keyed by book id.
+
+        ``fields`` (e.g. ``['id', 'title']``) limits what book-service reads and sends;
+        keep ``id`` in it.
+        """
+        books_by_id, book_ids = self._from_snapshot(book_ids, fields)
+        for chunk in self._chunks(book_ids):
+            books = self.get('/batch/', params=self._batch_params(chunk, fields))
+            books_by_id.update((book['id'], book) for book in books)
+        return books_by_id
+
+    def autocomplete(self, query, limit=10):
+        return self.get('/autocomplete/', params={'q': query, 'limit': limit})['suggestions']
+
+    def update_stock(self, book_id, stock_change):
+        return self.put(f'/{book_id}/stock/', json={'stock_change': stock_change})
+
+    def update_stocks(self, stock_changes):
+        """Apply ``{book_id: stock_change}`` in one all-or-nothing call; returns the updated books.
+
+        Raises ``ServiceError`` with 409 if any book would go below zero (nothing is applied).
+        """
+        return self.post('/stock/', json=self._stock_changes(stock_changes))
+
+    async def alist_books(self, ordering=None, cursor=None, page_size=None, fields=None):
+        return self._page(await self.aget('/', params=self._page_params(ordering, cursor, page_size, fields)))
+
+    async def alist_books_if_changed(self, etag=None, ordering=None, cursor=None, page_size=None, fields=None):
+        """Conditional fetch of one catalogue page.
+
+        Returns ``(page, etag)``; ``page`` is None when book-service answered 304
+        because the page still matches ``etag``.
+        """
+        headers = {'If-None-Match': etag} if etag else {}
+        response = await self.asend('GET', '/', expected=(200, 304), headers=headers,
+                                    params=self._page_params(ordering, cursor, page_size, fields))
+        page = None if response.status_code == 304 else self._page(self._decode(response))
+        return page, response.headers.get('ETag', etag)
+
+    async def aget_book(self, book_id):
+        book = self.snapshot.get(book_id) if self.snapshot else None
+        return book if book is not None else await self.aget(f'/{book_id}/')
+
+    async def aget_books(self, book_ids, fields=None):
+        """Async ``get_books``; batches are fetched concurrently."""
+        books_by_id, book_ids = self._from_snapshot(book_ids, fields)
+        results = await asyncio.gather(*(
+            self.aget('/batch/', params=self._batch_params(chunk, fields))
+            for chunk in self._chunks(book_ids)
+        ))
+        books_by_id.update((book['id'], book) for books in results for book in books)
+        return books_by_id
+
+    async def aautocomplete(self, query, limit=10):
+        return (await self.aget('/autocomplete/', params={'q': query, 'limit': limit}))['suggestions']
+
+    async def aupdate_stock(self, book_id, stock_change):
+        return await self.aput(f'/{book_id}/stock/', json={'stock_change': stock_change})
+
+    async def aupdate_stocks(self, stock_changes):
+        return await self.apost('/stock/', json=self._stock_changes(stock_changes))
+
+    def stats(self):
+        stats = super().stats()
+        if self.snapshot:
+            stats['snapshot'] = self.snapshot.stats()
+        return stats
+
+    def _from_snapshot(self, book_ids, fields):
+        """``({book_id: book}, ids left to fetch)``."""
+        if not self.snapshot:
+            return {}, book_ids
+        found, missing = self.snapshot.get_many(set(book_ids))
+        if fields:
+            found = {book_id: {name: book[name] for name in fields} for book_id, book in found.items()}
+        return found, missing
+
+    @staticmethod
+    def _stock_changes(stock_changes):
+        return {'changes': [
+            {'book_id': book_id, 'stock_change': stock_change}
+            for book_id, stock_change in stock_changes.items()
+        ]}
+
+    @staticmethod
+    def _batch_params(book_ids, fields):
+        params = {'ids': ','.join(map(str, book_ids))}
+        if fields:
+            params['fields'] = ','.join(fields)
+        return params
+
+    @staticmethod
+    def _page_params(ordering, cursor, page_size, fields=None):
+        params = {'ordering': ordering, 'cursor': cursor, 'page_size': page_size,
+                  'fields': ','.join(fields) if fields else None}
+        return {name: value for name, value in params.items() if value is not None}
+
+    @staticmethod
+    def _page(data):
+        # book-service returns next/previous links; only their cursors are useful here
+        def cursor(link):
+            return parse_qs(urlsplit(link).query).get('cursor', [None])[0] if link else None
+
+        return {
+            'results': data['results'],
+            'next_cursor': cursor(data['next']),
+            'previous_cursor': cursor(data['previous']),
+        }
+
+    @staticmethod
+    def _chunks(book_ids):
+        book_ids = sorted(set(book_ids))
+        return [book_ids[i:i + BATCH_SIZE] for i in range(0, len(book_ids), BATCH_SIZE)]
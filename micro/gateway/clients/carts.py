@@ -0,0 +1,40 @@
+from .base import ServiceClient
+
+
+class CartClient(ServiceClient):
+    """Client for cart-service (``/api/carts``)."""
+
+    service_name = 'cart'
+
+    def get_cart(self, customer_id):
+        return self.get(f'/{customer_id}/')
+
+    def get_cart_details(self, customer_id):
+        """Cart with embedded book data and line/cart totals, composed by cart-service."""
+        return self.get(f'/{customer_id}/details/')
+
+    def add_item(self, customer_id, book_id, quantity=1):
+        data = {'book_id': book_id, 'quantity': quantity}
+        return self.post(f'/{customer_id}/', json=data, expected=(201,))
+
+    def remove_item(self, item_id):
+        return self.delete(f'/items/{item_id}/')
+
+    def update_item(self, item_id, quantity):
+        return self.put(f'/items/{item_id}/update/', json={'quantity': quantity})
+
+    async def aget_cart(self, customer_id):
+        return await self.aget(f'/{customer_id}/')
+
+    async def aget_cart_details(self, customer_id):
+        return await self.aget(f'/{customer_id}/details/')
+
+    async def aadd_item(self, customer_id, book_id, quantity=1):
+        data = {'book_id': book_id, 'quantity': quantity}
+        return await self.apost(f'/{customer_id}/', json=data, expected=(201,))
+
+    async def aremove_item(self, item_id):
+        return await self.adelete(f'/items/{item_id}/')
+
+    async def aupdate_item(self, item_id, quantity):
+        return await self.aput(f'/items/{item_id}/update/', json={'quantity': quantity})
@@ -0,0 +1,29 @@
+from .base import ServiceClient
+
+
+class CustomerClient(ServiceClient):
+    """Client for customer-service (``/api/customers``)."""
+
+    service_name = 'customer'
+
+    def register(self, name, email, password):
+        data = {'name': name, 'email': email, 'password': password}
+        return self.post('/register/', json=data, expected=(201,))
+
+    def login(self, email, password):
+        data = {'email': email, 'password': password}
+        return self.post('/login/', json=data)
+
+    def get_customer(self, customer_id):
+        return self.get(f'/{customer_id}/')
+
+    async def aregister(self, name, email, password):
+        data = {'name': name, 'email': email, 'password': password}
+        return await self.apost('/register/', json=data, expected=(201,))
+
+    async def alogin(self, email, password):
+        data = {'email': email, 'password': password}
+        return await self.apost('/login/', json=data)
+
+    async def aget_customer(self, customer_id):
+        return await self.aget(f'/{customer_id}/')
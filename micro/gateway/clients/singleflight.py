@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import weakref
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one in-flight call.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait for it and share its result (or exception). ``executed`` and
+    ``collapsed`` count calls that went upstream and calls that piggybacked.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.collapsed = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = weakref.WeakKeyDictionary()
+
+    def stats(self):
+        with self._lock:
+            return {'executed': self.executed, 'collapsed': self.collapsed}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn):
+        # In-flight tasks are tracked per event loop: a task cannot be awaited from another loop
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        with self._lock:
+            if task is None:
+                self.executed += 1
+            else:
+                self.collapsed += 1
+
+        if task is None:
+            task = tasks[key] = loop.create_task(fn())
+            task.add_done_callback(lambda done: tasks.pop(key, None) if tasks.get(key) is done else None)
+
+        # Shielded so one caller being cancelled does not cancel the call for the others
+        return await asyncio.shield(task)
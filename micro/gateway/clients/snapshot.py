@@ -0,0 +1,172 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Must match books/snapshot.py in book-service
+MAGIC = b'BOOKSNAP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')  # magic, format version, reserved, count, version, index offset
+RECORD = struct.Struct('<qiHH')     # price in cents, stock, title length, author length
+
+
+class _MappedSnapshot:
+    """One snapshot file, mapped read-only; lookups read the mapping in place."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.stat = os.fstat(f.fileno())
+        magic, format_version, _, count, self.version, index_offset = HEADER.unpack_from(self.map)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} catalogue snapshot')
+        if index_offset + 16 * count > len(self.map):
+            raise ValueError(f'{path} is truncated')
+        index = memoryview(self.map)[index_offset:index_offset + 16 * count]
+        # Views of the mapping: binary search over them copies nothing
+        self.ids = index[:8 * count].cast('Q')
+        self.offsets = index[8 * count:].cast('Q')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, book_id):
+        i = bisect_left(self.ids, book_id)
+        if i == len(self.ids) or self.ids[i] != book_id:
+            return None
+        offset = self.offsets[i]
+        cents, stock, title_length, author_length = RECORD.unpack_from(self.map, offset)
+        start = offset + RECORD.size
+        return {
+            'id': book_id,
+            'title': self.map[start:start + title_length].decode(),
+            'author': self.map[start + title_length:start + title_length + author_length].decode(),
+            # As book-service's DecimalField renders it
+            'price': f"{'-' if cents < 0 else ''}{abs(cents) // 100}.{abs(cents) % 100:02d}",
+            'stock': stock,
+        }
+
+
+class CatalogSnapshot:
+    """Read-only view of the catalogue snapshot book-service publishes (see its
+    ``books/snapshot.py`` for the file format).
+
+    The file is memory-mapped, so all gateway workers on the host share one copy
+    of the catalogue in the OS page cache instead of each holding its own, and
+    ``get(book_id)`` decodes just that book. At most every ``check_interval``
+    seconds the file is checked for replacement; a new version is mapped and
+    swapped in with a single assignment, while lookups already running finish on
+    the previous mapping, which is released once nothing uses it.
+
+    Books published after the snapshot are simply missing: callers fetch those
+    from book-service. The file's mtime is when book-service last found it
+    current (see its ``books/snapshot.py``); a snapshot older than ``max_age``
+    seconds is not used, so stock and prices are never shown staler than that,
+    e.g. when the publisher stopped. Without a readable, fresh snapshot every
+    lookup misses and callers fall back to book-service.
+    """
+
+    def __init__(self, path, check_interval=1, max_age=30):
+        if sys.byteorder != 'little':
+            raise ValueError('Catalogue snapshots are little-endian')
+        self.path = path
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._snapshot = None
+        self._verified_at = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._unavailable = False
+        self._stale = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls):
+        """The configured snapshot, or None when ``CATALOG_SNAPSHOT['PATH']`` is not set."""
+        config = getattr(settings, 'CATALOG_SNAPSHOT', {})
+        if not config.get('PATH'):
+            return None
+        return cls(config['PATH'], check_interval=config.get('CHECK_INTERVAL', 1),
+                   max_age=config.get('MAX_AGE', 30))
+
+    @property
+    def version(self):
+        snapshot = self._current()
+        return snapshot.version if snapshot else None
+
+    def available(self):
+        return self._current() is not None
+
+    def get(self, book_id):
+        found, _ = self.get_many([book_id])
+        return found.get(book_id)
+
+    def get_many(self, book_ids):
+        """``({book_id: book}, [ids not in the snapshot])``, all read from one version."""
+        snapshot = self._current()
+        found, missing = {}, []
+        for book_id in book_ids:
+            book = snapshot.get(book_id) if snapshot else None
+            if book is None:
+                missing.append(book_id)
+            else:
+                found[book_id] = book
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def stats(self):
+        snapshot = self._current()
+        return {
+            'version': snapshot.version if snapshot else None,
+            'books': len(snapshot) if snapshot else 0,
+            'stale': self._stale,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def _current(self):
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.check_interval:
+            with self._lock:
+                if self._checked_at == checked_at:
+                    self._reload()
+                    self._checked_at = time.monotonic()
+        stale = (self._verified_at is not None and self.max_age is not None
+                 and time.time() - self._verified_at > self.max_age)
+        if stale != self._stale:
+            self._stale = stale
+            if stale:
+                logger.warning('Catalogue snapshot %s not confirmed current for %ss, not using it',
+                               self.path, self.max_age)
+        return None if stale else self._snapshot
+
+    def _reload(self):
+        current = self._snapshot
+        try:
+            stat = os.stat(self.path)
+            # A new version is a new file (renamed over the old one); a touch only refreshes its age
+            if current and (stat.st_dev, stat.st_ino) == (current.stat.st_dev, current.stat.st_ino):
+                self._verified_at = stat.st_mtime
+                return
+            snapshot = _MappedSnapshot(self.path)
+        except (OSError, ValueError, struct.error) as e:
+            # Keep serving the mapping already held, if any, until it is too old
+            if not self._unavailable:
+                logger.warning('Catalogue snapshot %s unavailable: %s', self.path, e)
+                self._unavailable = True
+            return
+        self._unavailable = False
+        self._verified_at = snapshot.stat.st_mtime
+        if current is None or snapshot.version != current.version:
+            logger.info('Catalogue snapshot %s: version %d, %d books', self.path, snapshot.version, len(snapshot))
+        self._snapshot = snapshot
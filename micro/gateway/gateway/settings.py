@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gateway.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,7 +55,7 @@ ROOT_URLCONF = 'gateway.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'gateway.tracing.TracedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -68,6 +69,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'gateway.wsgi.application'
+ASGI_APPLICATION = 'gateway.asgi.application'
 
 
 # Database
@@ -81,6 +83,84 @@ DATABASES = {
 }
 
 
+# Downstream services
+# Each service gets its own keep-alive connection pool in the gateway (see clients/).
+# Timeouts are in seconds.
+# TRANSPORT: 'tcp' (default); 'uds' with 'SOCKET': '/path/to.sock' when the service
+# runs on the same host behind a Unix socket.
+# FORMAT: wire format for requests and responses, 'msgpack' (default) or 'json'.
+
+SERVICES = {
+    'customer': {
+        'BASE_URL': 'http://localhost:8002/api/customers',
+        'POOL_SIZE': 10,
+        'CONNECT_TIMEOUT': 3.05,
+        'READ_TIMEOUT': 10,
+    },
+    'book': {
+        'BASE_URL': 'http://localhost:8003/api/books',
+        'POOL_SIZE': 20,
+        'CONNECT_TIMEOUT': 3.05,
+        'READ_TIMEOUT': 10,
+    },
+    'cart': {
+        'BASE_URL': 'http://localhost:8004/api/carts',
+        'POOL_SIZE': 20,
+        'CONNECT_TIMEOUT': 3.05,
+        'READ_TIMEOUT': 10,
+    },
+}
+
+
+# Catalog cache (seconds): each books page is served from memory for TTL, then served
+# stale for up to STALE_TTL more while it is refreshed in the background. At most
+# MAX_PAGES catalogue pages are kept.
+
+CATALOG_CACHE = {
+    'TTL': 30,
+    'STALE_TTL': 300,
+    'MAX_PAGES': 256,
+}
+
+# Catalogue snapshot published by book-service (`manage.py publish_catalog_snapshot`)
+# on the same host, memory-mapped and shared by all gateway workers (see
+# clients/snapshot.py); checked for a new version every CHECK_INTERVAL seconds.
+# While it is readable, cached catalogue pages hold only book ids. A snapshot not
+# confirmed current for MAX_AGE seconds (the publisher must run with a shorter
+# --interval) is ignored and pages hold full rows again. PATH None disables it.
+
+CATALOG_SNAPSHOT = {
+    'PATH': BASE_DIR.parent / 'book-service' / 'catalog.snapshot',
+    'CHECK_INTERVAL': 1,
+    'MAX_AGE': 30,
+}
+
+
+# Tracing: one JSON line per request is appended to trace.log (see gateway/tracing.py)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'trace': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'trace_file': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'trace.log',
+            'formatter': 'trace',
+        },
+    },
+    'loggers': {
+        'tracing': {
+            'handlers': ['trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from clients import book_client
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogPage:
+    def __init__(self):
+        self.books = None
+        # Instead of books, with a catalogue snapshot: they are read from it when rendered
+        self.book_ids = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        self.etag = None
+        self.fetched_at = None
+        self.refresh_task = None
+
+    def age(self):
+        if self.fetched_at is None:
+            return None
+        return time.monotonic() - self.fetched_at
+
+    def loaded(self):
+        return self.books is not None or self.book_ids is not None
+
+    def content_etag(self):
+        """``etag``, plus the snapshot version when the books come from the snapshot."""
+        if self.book_ids is None:
+            return self.etag
+        return f'{self.etag}:{book_client.snapshot.version}'
+
+    async def abooks(self):
+        if self.book_ids is None:
+            return self.books
+        try:
+            # Books published after the snapshot are fetched from book-service
+            books = await book_client.aget_books(self.book_ids)
+        except Exception:
+            logger.warning('book-service unavailable, showing only the books in the catalogue snapshot')
+            books, _ = book_client.snapshot.get_many(self.book_ids)
+        return [books[book_id] for book_id in self.book_ids if book_id in books]
+
+
+class CatalogCache:
+    """In-memory copy of the book catalogue pages with stale-while-revalidate refresh.
+
+    Each page, keyed by ``(ordering, cursor)``, is refreshed on its own:
+
+    - younger than ``ttl``: served from memory
+    - older than ``ttl`` but within ``ttl + stale_ttl``: served stale while a single
+      background task refreshes it
+    - older than that, or never loaded: refreshed before responding
+
+    Refreshes are conditional GETs (``If-None-Match``), so an unchanged page
+    costs book-service a 304 instead of a full re-serialization. If book-service
+    fails, whatever copy is still held is served instead of an error. At most
+    ``max_pages`` pages are kept; the least recently used is dropped first.
+
+    When the book client has a catalogue snapshot (see ``clients/snapshot.py``),
+    pages fetch and hold only their book ids, and ``CatalogPage.abooks()`` reads
+    the books from the snapshot every worker shares, instead of each worker
+    keeping its own copy of every page.
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300, max_pages=256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'CATALOG_CACHE', {})
+        return cls(
+            ttl=config.get('TTL', 30),
+            stale_ttl=config.get('STALE_TTL', 300),
+            max_pages=config.get('MAX_PAGES', 256),
+        )
+
+    def invalidate(self):
+        for page in self.pages.values():
+            page.fetched_at = None
+
+    async def aget(self, ordering=None, cursor=None):
+        page = self._page(ordering, cursor)
+        age = page.age()
+        if age is not None and age < self.ttl:
+            return page
+        if age is not None and age < self.ttl + self.stale_ttl:
+            self._schedule_refresh(page, ordering, cursor)
+            return page
+
+        try:
+            return await self._arefresh(page, ordering, cursor)
+        except Exception:
+            if not page.loaded():
+                raise
+            logger.warning('book-service unavailable, serving stale catalog page')
+            return page
+
+    def _page(self, ordering, cursor):
+        key = (ordering, cursor)
+        page = self.pages.get(key)
+        if page is None:
+            page = self.pages[key] = CatalogPage()
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(key)
+        return page
+
+    async def _arefresh(self, page, ordering, cursor):
+        ids_only = book_client.snapshot is not None and book_client.snapshot.available()
+        # The ETag does not cover ?fields=, so revalidate only a page held the same way
+        held = page.book_ids if ids_only else page.books
+        etag = page.etag if held is not None else None
+        data, etag = await book_client.alist_books_if_changed(
+            etag, ordering=ordering, cursor=cursor, fields=['id'] if ids_only else None,
+        )
+        if data is not None:
+            if ids_only:
+                page.books, page.book_ids = None, [book['id'] for book in data['results']]
+            else:
+                page.books, page.book_ids = data['results'], None
+            page.next_cursor = data['next_cursor']
+            page.previous_cursor = data['previous_cursor']
+        page.etag = etag
+        page.fetched_at = time.monotonic()
+        return page
+
+    def _schedule_refresh(self, page, ordering, cursor):
+        if page.refresh_task is None or page.refresh_task.done():
+            page.refresh_task = asyncio.create_task(self._background_refresh(page, ordering, cursor))
+
+    async def _background_refresh(self, page, ordering, cursor):
+        try:
+            await self._arefresh(page, ordering, cursor)
+        except Exception:
+            logger.warning('Background catalog refresh failed, keeping stale copy', exc_info=True)
+
+
+catalog_cache = CatalogCache.from_settings()
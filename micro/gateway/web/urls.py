@@ -7,8 +7,10 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('books/', views.books, name='books'),
+    path('books/autocomplete/', views.books_autocomplete, name='books_autocomplete'),
     path('cart/', views.cart_view, name='cart'),
     path('cart/add/<int:book_id>/', views.add_to_cart, name='add_to_cart'),
     path('cart/remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
     path('cart/update/<int:item_id>/', views.update_cart_item, name='update_cart_item'),
+    path('metrics/clients/', views.client_metrics, name='client_metrics'),
 ]
@@ -1,165 +1,212 @@
-import requests
+import hashlib
+
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from clients import ServiceError, customer_client, book_client, cart_client
+from .catalog import catalog_cache
+
+# Orderings offered on the books page, as understood by book-service
+BOOK_ORDERINGS = {
+    'title': 'Tên sách (A-Z)',
+    '-title': 'Tên sách (Z-A)',
+    'price': 'Giá tăng dần',
+    '-price': 'Giá giảm dần',
+}
+
 
-# Service URLs
-CUSTOMER_SERVICE = 'http://localhost:8002/api/customers'
-BOOK_SERVICE = 'http://localhost:8003/api/books'
-CART_SERVICE = 'http://localhost:8004/api/carts'
+async def _session_user_id(request):
+    # Loads the session without blocking the event loop, so templates can read it afterwards
+    return await request.session.aget('user_id')
+
+
+def _books_page_etag(request, catalog_etag):
+    # The page also depends on who is logged in and on the CSRF secret in its forms
+    page = ':'.join(str(part) for part in (
+        catalog_etag,
+        request.session.get('user_id'),
+        request.session.get('user_name'),
+        request.META.get('CSRF_COOKIE', ''),
+    ))
+    return quote_etag(hashlib.md5(page.encode()).hexdigest())
 
 
 def home(request):
     return render(request, 'home.html')
 
 
-def register(request):
+async def register(request):
+    await _session_user_id(request)
     if request.method == 'POST':
-        data = {
-            'name': request.POST['name'],
-            'email': request.POST['email'],
-            'password': request.POST['password']
-        }
         try:
-            response = requests.post(f'{CUSTOMER_SERVICE}/register/', json=data)
-            if response.status_code == 201:
-                messages.success(request, 'Đăng ký thành công! Vui lòng đăng nhập.')
-                return redirect('login')
-            else:
-                messages.error(request, 'Đăng ký thất bại!')
+            await customer_client.aregister(
+                name=request.POST['name'],
+                email=request.POST['email'],
+                password=request.POST['password']
+            )
+            messages.success(request, 'Đăng ký thành công! Vui lòng đăng nhập.')
+            return redirect('login')
+        except ServiceError:
+            messages.error(request, 'Đăng ký thất bại!')
         except Exception as e:
             messages.error(request, f'Lỗi kết nối: {str(e)}')
-    
+
     return render(request, 'register.html')
 
 
-def login_view(request):
+async def login_view(request):
+    await _session_user_id(request)
     if request.method == 'POST':
-        data = {
-            'email': request.POST['email'],
-            'password': request.POST['password']
-        }
         try:
-            response = requests.post(f'{CUSTOMER_SERVICE}/login/', json=data)
-            if response.status_code == 200:
-                user_data = response.json()
-                request.session['user_id'] = user_data['id']
-                request.session['user_name'] = user_data['name']
-                request.session['user_email'] = user_data['email']
-                messages.success(request, f'Chào mừng {user_data["name"]}!')
-                return redirect('books')
-            else:
-                messages.error(request, 'Email hoặc mật khẩu không đúng!')
+            user_data = await customer_client.alogin(
+                email=request.POST['email'],
+                password=request.POST['password']
+            )
+            await request.session.aset('user_id', user_data['id'])
+            await request.session.aset('user_name', user_data['name'])
+            await request.session.aset('user_email', user_data['email'])
+            messages.success(request, f'Chào mừng {user_data["name"]}!')
+            return redirect('books')
+        except ServiceError:
+            messages.error(request, 'Email hoặc mật khẩu không đúng!')
         except Exception as e:
             messages.error(request, f'Lỗi kết nối: {str(e)}')
-    
+
     return render(request, 'login.html')
 
 
-def logout_view(request):
-    request.session.flush()
+async def logout_view(request):
+    await request.session.aflush()
     messages.success(request, 'Đã đăng xuất!')
     return redirect('home')
 
 
-def books(request):
-    if 'user_id' not in request.session:
+async def books(request):
+    if not await _session_user_id(request):
         messages.warning(request, 'Vui lòng đăng nhập!')
         return redirect('login')
-    
+
+    ordering = request.GET.get('ordering')
+    if ordering not in BOOK_ORDERINGS:
+        ordering = 'title'
+    cursor = request.GET.get('cursor') or None
+
+    page = None
     try:
-        response = requests.get(f'{BOOK_SERVICE}/')
-        books_list = response.json() if response.status_code == 200 else []
+        page = await catalog_cache.aget(ordering, cursor)
+    except ServiceError:
+        pass
     except Exception as e:
-        books_list = []
         messages.error(request, f'Không thể tải danh sách sách: {str(e)}')
-    
-    return render(request, 'books.html', {'books': books_list})
+
+    # Pages carrying flash messages are never revalidated, they must be rendered
+    page_etag = None
+    if page and page.etag and not len(messages.get_messages(request)):
+        page_etag = _books_page_etag(request, page.content_etag())
+        not_modified = get_conditional_response(request, etag=page_etag)
+        if not_modified is not None:
+            return not_modified
+
+    response = render(request, 'books.html', {
+        'books': await page.abooks() if page else [],
+        'ordering': ordering,
+        'orderings': BOOK_ORDERINGS,
+        'next_cursor': page.next_cursor if page else None,
+        'previous_cursor': page.previous_cursor if page else None,
+    })
+    if page_etag:
+        response.headers['ETag'] = page_etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
-def add_to_cart(request, book_id):
-    if 'user_id' not in request.session:
+async def books_autocomplete(request):
+    # Type-ahead for the books page: without book-service it just suggests nothing
+    try:
+        suggestions = await book_client.aautocomplete(request.GET.get('q', ''))
+    except Exception:
+        suggestions = []
+    return JsonResponse({'suggestions': suggestions})
+
+
+async def add_to_cart(request, book_id):
+    customer_id = await _session_user_id(request)
+    if not customer_id:
         return redirect('login')
-    
-    customer_id = request.session['user_id']
-    data = {
-        'book_id': book_id,
-        'quantity': int(request.POST.get('quantity', 1))
-    }
-    
+
+    quantity = int(request.POST.get('quantity', 1))
+
     try:
-        response = requests.post(f'{CART_SERVICE}/{customer_id}/', json=data)
-        if response.status_code == 201:
-            messages.success(request, 'Đã thêm sách vào giỏ hàng!')
-        else:
-            messages.error(request, 'Không thể thêm vào giỏ hàng!')
+        await cart_client.aadd_item(customer_id, book_id, quantity)
+        messages.success(request, 'Đã thêm sách vào giỏ hàng!')
+    except ServiceError:
+        messages.error(request, 'Không thể thêm vào giỏ hàng!')
     except Exception as e:
         messages.error(request, f'Lỗi: {str(e)}')
-    
+
     return redirect('books')
 
 
-def cart_view(request):
-    if 'user_id' not in request.session:
+async def cart_view(request):
+    customer_id = await _session_user_id(request)
+    if not customer_id:
         return redirect('login')
-    
-    customer_id = request.session['user_id']
+
     cart_items = []
     total_price = 0
-    
+
     try:
-        # Get cart from cart service
-        cart_response = requests.get(f'{CART_SERVICE}/{customer_id}/')
-        if cart_response.status_code == 200:
-            cart_data = cart_response.json()
-            
-            # Get book details for each cart item
-            for item in cart_data.get('items', []):
-                book_response = requests.get(f'{BOOK_SERVICE}/{item["book_id"]}/')
-                if book_response.status_code == 200:
-                    book = book_response.json()
-                    item_total = float(book['price']) * item['quantity']
-                    cart_items.append({
-                        'id': item['id'],
-                        'book': book,
-                        'quantity': item['quantity'],
-                        'total': item_total
-                    })
-                    total_price += item_total
+        # Cart service returns the cart already joined with book data and totals
+        cart_data = await cart_client.aget_cart_details(customer_id)
+        for item in cart_data['items']:
+            if item['book']:
+                cart_items.append({
+                    'id': item['id'],
+                    'book': item['book'],
+                    'quantity': item['quantity'],
+                    'total': item['line_total']
+                })
+        total_price = cart_data['total_price']
+    except ServiceError:
+        pass
     except Exception as e:
         messages.error(request, f'Lỗi khi tải giỏ hàng: {str(e)}')
-    
+
     return render(request, 'cart.html', {
         'cart_items': cart_items,
         'total_price': total_price
     })
 
 
-def remove_from_cart(request, item_id):
+async def remove_from_cart(request, item_id):
     if request.method == 'POST':
         try:
-            response = requests.delete(f'{CART_SERVICE}/items/{item_id}/')
-            if response.status_code == 200:
-                messages.success(request, 'Đã xóa sách khỏi giỏ hàng!')
-            else:
-                messages.error(request, 'Không thể xóa!')
+            await cart_client.aremove_item(item_id)
+            messages.success(request, 'Đã xóa sách khỏi giỏ hàng!')
+        except ServiceError:
+            messages.error(request, 'Không thể xóa!')
         except Exception as e:
             messages.error(request, f'Lỗi: {str(e)}')
-    
+
     return redirect('cart')
 
 
-def update_cart_item(request, item_id):
+async def update_cart_item(request, item_id):
     if request.method == 'POST':
-        quantity = request.POST.get('quantity')
-        data = {'quantity': int(quantity)}
+        quantity = int(request.POST.get('quantity'))
         try:
-            response = requests.put(f'{CART_SERVICE}/items/{item_id}/update/', json=data)
-            if response.status_code == 200:
-                messages.success(request, 'Đã cập nhật số lượng!')
-            else:
-                messages.error(request, 'Không thể cập nhật!')
+            await cart_client.aupdate_item(item_id, quantity)
+            messages.success(request, 'Đã cập nhật số lượng!')
+        except ServiceError:
+            messages.error(request, 'Không thể cập nhật!')
         except Exception as e:
             messages.error(request, f'Lỗi: {str(e)}')
-    
+
     return redirect('cart')
 
+
+def client_metrics(request):
+    clients = (customer_client, book_client, cart_client)
+    return JsonResponse({client.service_name: client.stats() for client in clients})
@@ -0,0 +1,205 @@
+"""Asyncio load generator for the gateway user journey.
+
+Each virtual user runs the real journey through the gateway:
+
+    register -> login -> books -> add_to_cart -> cart -> update -> remove
+
+New journeys are started at a fixed arrival rate (open model, so a slow gateway
+does not slow the offered load down), with at most --concurrency journeys in
+flight. At the end it prints, per step, the request count, errors, throughput
+and p50/p95/p99 latency.
+
+Usage:
+    python tools/loadtest.py --base-url http://localhost:8005 --rate 20 --duration 60 --concurrency 200
+    python tools/loadtest.py --rate 20 --duration 60 --json results.json
+    python tools/loadtest.py --rate 20 --duration 60 --baseline results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+STEPS = ['register', 'login', 'books', 'add_to_cart', 'cart', 'update', 'remove']
+BOOK_LINK = re.compile(r'/cart/add/(\d+)/')
+ITEM_LINK = re.compile(r'/cart/remove/(\d+)/')
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = 0
+        self.failed_journeys = 0
+        self.dropped = 0
+
+    def summary(self, elapsed):
+        steps = {}
+        for step in STEPS:
+            latencies = sorted(self.latencies[step])
+            steps[step] = {
+                'count': len(latencies),
+                'errors': self.errors[step],
+                'throughput': len(latencies) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+            }
+        return {
+            'elapsed_s': elapsed,
+            'journeys': self.journeys,
+            'failed_journeys': self.failed_journeys,
+            'dropped': self.dropped,
+            'steps': steps,
+        }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def timed(results, step, request, expected_status):
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as exc:
+        results.errors[step] += 1
+        raise StepFailed(f'{step}: {exc!r}')
+    results.latencies[step].append((time.perf_counter() - start) * 1000)
+    if response.status_code != expected_status:
+        results.errors[step] += 1
+        raise StepFailed(f'{step}: HTTP {response.status_code}')
+    return response
+
+
+def form(client, **fields):
+    # Django accepts the unmasked CSRF secret from the cookie as the form token
+    fields['csrfmiddlewaretoken'] = client.cookies.get('csrftoken', '')
+    return fields
+
+
+async def journey(base_url, run_id, number, results, transport):
+    email = f'load-{run_id}-{number}@example.com'
+    password = 'load-test-password'
+    # Not closed per journey: that would close the shared transport
+    client = httpx.AsyncClient(base_url=base_url, transport=transport, timeout=30)
+    await client.get('/register/')  # sets the CSRF cookie
+    await timed(results, 'register', client.post(
+        '/register/', data=form(client, name=f'Load {number}', email=email, password=password)), 302)
+    await timed(results, 'login', client.post(
+        '/login/', data=form(client, email=email, password=password)), 302)
+
+    books_page = await timed(results, 'books', client.get('/books/'), 200)
+    book_ids = BOOK_LINK.findall(books_page.text)
+    if not book_ids:
+        results.errors['books'] += 1
+        raise StepFailed('books: no book can be added to the cart')
+
+    await timed(results, 'add_to_cart', client.post(
+        f'/cart/add/{random.choice(book_ids)}/', data=form(client, quantity=1)), 302)
+
+    cart_page = await timed(results, 'cart', client.get('/cart/'), 200)
+    item_ids = ITEM_LINK.findall(cart_page.text)
+    if not item_ids:
+        results.errors['cart'] += 1
+        raise StepFailed('cart: added item missing from cart')
+
+    await timed(results, 'update', client.post(
+        f'/cart/update/{item_ids[0]}/', data=form(client, quantity=2)), 302)
+    await timed(results, 'remove', client.post(
+        f'/cart/remove/{item_ids[0]}/', data=form(client)), 302)
+
+
+async def run(args):
+    results = Results()
+    run_id = uuid.uuid4().hex[:8]
+    # One shared connection pool; every virtual user keeps its own cookies
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+
+    async def one(number):
+        try:
+            await journey(args.base_url, run_id, number, results, transport)
+            results.journeys += 1
+        except (StepFailed, httpx.HTTPError) as exc:
+            results.failed_journeys += 1
+            if args.verbose:
+                print(f'journey {number} failed at {exc}')
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    number = 0
+    next_arrival = start
+    while time.perf_counter() - start < args.duration:
+        next_arrival += random.expovariate(args.rate) if args.poisson else 1 / args.rate
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        if slots.locked():
+            # Concurrency limit reached: count the arrival as dropped instead of queueing it
+            results.dropped += 1
+            continue
+        await slots.acquire()
+        number += 1
+        task = asyncio.create_task(one(number))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+    return results.summary(elapsed)
+
+
+def print_summary(summary, baseline=None):
+    print(f"\n{summary['journeys']} journeys ok, {summary['failed_journeys']} failed, "
+          f"{summary['dropped']} dropped in {summary['elapsed_s']:.1f}s "
+          f"({summary['journeys'] / summary['elapsed_s']:.1f} journeys/s)\n")
+    print(f"{'step':<12} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step, stats in summary['steps'].items():
+        line = (f"{step:<12} {stats['count']:>7} {stats['errors']:>7} {stats['throughput']:>8.1f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+        if baseline and step in baseline['steps'] and baseline['steps'][step]['p95_ms']:
+            change = stats['p95_ms'] / baseline['steps'][step]['p95_ms'] - 1
+            line += f'   p95 {change:+.0%} vs baseline'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8005')
+    parser.add_argument('--rate', type=float, default=10, help='new journeys per second')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to keep starting journeys')
+    parser.add_argument('--concurrency', type=int, default=100, help='max journeys in flight')
+    parser.add_argument('--poisson', action='store_true', help='exponential inter-arrival times')
+    parser.add_argument('--json', help='write the summary to this file')
+    parser.add_argument('--baseline', help='summary JSON from an earlier run to compare p95 against')
+    parser.add_argument('--verbose', action='store_true', help='print each failed journey')
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+    print_summary(summary, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(summary, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Aggregate the trace.log files written by the gateway and the services.
+
+Usage:
+    python tools/trace_report.py gateway/trace.log book-service/trace.log cart-service/trace.log
+    python tools/trace_report.py */trace.log --request-id 3f2c...
+
+Without --request-id, prints per endpoint (service + method + path, with numeric
+ids collapsed to <id>) the request count, p50/p95/p99 of total time and the mean
+time per span. With --request-id, prints every hop of that one request.
+"""
+import argparse
+import json
+import re
+from collections import defaultdict
+
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def load(paths):
+    entries = []
+    for path in paths:
+        with open(path, encoding='utf-8') as trace_file:
+            for line in trace_file:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+    return entries
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def endpoint_report(entries):
+    groups = defaultdict(list)
+    for entry in entries:
+        endpoint = f"{entry['service']:<9} {entry['method']:<6} {ID_SEGMENT.sub('/<id>', entry['path'])}"
+        groups[endpoint].append(entry)
+
+    for endpoint, group in sorted(groups.items()):
+        totals = sorted(entry['total_ms'] for entry in group)
+        span_totals = defaultdict(float)
+        for entry in group:
+            for name, duration in entry['spans'].items():
+                span_totals[name] += duration
+        spans = '  '.join(f'{name}={total / len(group):.1f}' for name, total in sorted(span_totals.items()))
+        print(f'{endpoint:<50} n={len(group):<6} p50={percentile(totals, 50):7.1f}ms '
+              f'p95={percentile(totals, 95):7.1f}ms p99={percentile(totals, 99):7.1f}ms  {spans}')
+
+
+def request_report(entries, request_id):
+    hops = sorted((entry for entry in entries if entry['request_id'] == request_id), key=lambda e: e['ts'])
+    if not hops:
+        print(f'No trace entries for request id {request_id}')
+        return
+    for entry in hops:
+        spans = '  '.join(f'{name}={duration:.1f}' for name, duration in entry['spans'].items())
+        print(f"{entry['service']:<9} {entry['method']:<6} {entry['path']:<40} {entry['status']} "
+              f"total={entry['total_ms']:.1f}ms  {spans}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='trace.log files to read')
+    parser.add_argument('--request-id', help='show all hops of a single request')
+    args = parser.parse_args()
+
+    entries = load(args.paths)
+    if args.request_id:
+        request_report(entries, args.request_id)
+    else:
+        endpoint_report(entries)
+
+
+if __name__ == '__main__':
+    main()
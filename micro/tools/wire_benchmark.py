@@ -0,0 +1,131 @@
+"""Compare JSON and MessagePack as the inter-service wire format.
+
+Builds payloads shaped like the real responses (the book-service catalogue and
+cart-service cart details), then times encode and decode with each format and
+compares payload sizes. JSON is encoded the way DRF's JSONRenderer does it
+(compact separators, UTF-8), MessagePack the way the services' renderer does.
+
+Pass --url to benchmark a live response instead, e.g. the full catalogue.
+
+Usage:
+    python tools/wire_benchmark.py
+    python tools/wire_benchmark.py --books 20000 --cart-items 500 --repeat 50
+    python tools/wire_benchmark.py --url http://localhost:8003/api/books/
+"""
+import argparse
+import json
+import random
+import time
+
+import msgpack
+
+
+def catalog_payload(count):
+    return [
+        {
+            'id': book_id,
+            'title': f'Book title number {book_id}',
+            'author': f'Author {book_id % 500}',
+            'price': f'{random.uniform(5, 120):.2f}',
+            'stock': random.randint(0, 200),
+        }
+        for book_id in range(1, count + 1)
+    ]
+
+
+def cart_payload(item_count):
+    items = []
+    total = 0.0
+    for item_id in range(1, item_count + 1):
+        quantity = random.randint(1, 5)
+        price = random.uniform(5, 120)
+        total += price * quantity
+        items.append({
+            'id': item_id,
+            'book_id': item_id,
+            'quantity': quantity,
+            'book': {
+                'id': item_id,
+                'title': f'Book title number {item_id}',
+                'author': f'Author {item_id % 500}',
+                'price': f'{price:.2f}',
+            },
+            'line_total': f'{price * quantity:.2f}',
+        })
+    return {
+        'id': 1,
+        'customer_id': 1,
+        'items': items,
+        'total_items': sum(item['quantity'] for item in items),
+        'total_price': f'{total:.2f}',
+    }
+
+
+def json_encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_decode(content):
+    return json.loads(content)
+
+
+def msgpack_encode(data):
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def msgpack_decode(content):
+    return msgpack.unpackb(content, raw=False)
+
+
+FORMATS = {
+    'json': (json_encode, json_decode),
+    'msgpack': (msgpack_encode, msgpack_decode),
+}
+
+
+def best_ms(fn, arg, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compare(name, data, repeat):
+    print(f'\n{name}')
+    print(f"{'format':<9} {'bytes':>10} {'size':>7} {'encode ms':>10} {'decode ms':>10}")
+    json_size = None
+    for format_name, (encode, decode) in FORMATS.items():
+        content = encode(data)
+        if json_size is None:
+            json_size = len(content)
+        print(f'{format_name:<9} {len(content):>10} {len(content) / json_size:>7.0%} '
+              f'{best_ms(encode, data, repeat):>10.2f} {best_ms(decode, content, repeat):>10.2f}')
+
+
+def fetch(url):
+    import httpx
+    response = httpx.get(url, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=10000, help='books in the synthetic catalogue')
+    parser.add_argument('--cart-items', type=int, default=200, help='items in the synthetic cart')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per measurement; the best is reported')
+    parser.add_argument('--url', help='benchmark this live JSON response instead of synthetic payloads')
+    args = parser.parse_args()
+
+    random.seed(0)
+    if args.url:
+        compare(args.url, fetch(args.url), args.repeat)
+        return
+    compare(f'catalogue ({args.books} books)', catalog_payload(args.books), args.repeat)
+    compare(f'cart details ({args.cart_items} items)', cart_payload(args.cart_items), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,101 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
+from .export import FORMATS as EXPORT_FORMATS, export_response
+from .facets import BookFacetFilter, facet_counts, facets_requested, selected_facets
+from .fastpath import RowPlan
+from .fieldsets import selected_columns
 from .models import Book
+from .pagination import KeysetPagination
+from .search import BookIndexSearchFilter, search_books
 from .serializers import BookSerializer
 
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
 class BookViewSet(viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['author', 'price', 'stock']
-    search_fields = ['title', 'author']
+    filter_backends = [DjangoFilterBackend, BookFacetFilter, BookIndexSearchFilter, filters.OrderingFilter]
+    # author is a facet (BookFacetFilter)
+    filterset_fields = ['price', 'stock']
     ordering_fields = ['title', 'author', 'price', 'stock']
     ordering = ['title']
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            # Only the columns left by ?fields= / ?exclude=
+            queryset = queryset.only(*selected_columns(self.get_serializer()))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # Rows as tuples through a precompiled plan instead of a serializer per book;
+        # the plan reads only the columns left by ?fields= / ?exclude=
+        plan = RowPlan.for_serializer(self.get_serializer())
+        columns = plan.query_columns(self.paginator.get_ordering(request, self).lstrip('-'), 'id')
+        rows = self.paginate_queryset(self.filter_queryset(self.get_queryset()).values_list(*columns, named=True))
+        response = self.get_paginated_response(plan.represent(rows))
+        if facets_requested(request):
+            response.data['facets'] = self.facet_counts(request)
+        return response
+
+    def facet_counts(self, request):
+        """Facet counts for the filtered list, from the counts table unless a
+        filter it does not cover (a search, exact price or stock) narrows the list."""
+        selected = selected_facets(request)
+        other_filters = [*self.filterset_fields, BookIndexSearchFilter.search_param]
+        if not any(request.query_params.get(name) for name in other_filters):
+            return facet_counts(selected)
+        books = self.get_queryset()
+        for backend in self.filter_backends:
+            # Each facet is counted under the other facets' selections only
+            if backend is not BookFacetFilter:
+                books = backend().filter_queryset(request, books, self)
+        return facet_counts(selected, books)
+
+    @action(detail=False)
+    def search(self, request):
+        """Ranked search on title and author: ``?q=&page=&page_size=``."""
+        query = request.query_params.get('q', '')
+        page = self._int_param(request, 'page', 1, 1, None)
+        page_size = self._int_param(request, 'page_size', SEARCH_PAGE_SIZE, 1, SEARCH_MAX_PAGE_SIZE)
+        books, has_more = search_books(query, offset=(page - 1) * page_size, limit=page_size)
+
+        url = request.build_absolute_uri()
+        results = []
+        for book in books:
+            data = self.get_serializer(book).data
+            data['score'] = book.score
+            results.append(data)
+        return Response({
+            'query': query,
+            'page': page,
+            'next': replace_query_param(url, 'page', page + 1) if has_more else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'results': results,
+        })
+
+    @staticmethod
+    def _int_param(request, name, default, minimum, maximum):
+        try:
+            value = max(int(request.query_params[name]), minimum)
+        except (KeyError, ValueError):
+            return default
+        return min(value, maximum) if maximum else value
+
+
+# Plain Django view: DRF would treat ?format= as a renderer override
+@require_GET
+def export_books(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    return export_response(export_format)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'books'
+
+    def ready(self):
+        from . import facets, search
+        search.connect_signals()
+        facets.connect_signals()
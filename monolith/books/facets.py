@@ -0,0 +1,212 @@
+"""Faceted catalogue browsing: book counts per author, price band and stock state.
+
+Counting facets on each request would group the whole ``books`` table. Instead
+``BookFacetCount`` holds the number of books in every (author, price band, in
+stock) combination, a table the size of the number of authors times the bands,
+adjusted on each book save and delete (signals connected in
+``BooksConfig.ready``). A facet's counts are one ``GROUP BY`` over that table,
+filtered by the other facets' selections: with a price band selected, the
+author counts are those within the band, and the band counts still show the
+other bands to switch to.
+
+``bulk_create`` and ``QuerySet.update()`` send no signals, so the importer
+adjusts the counts itself and ``rebuild_facet_counts`` recounts from scratch
+after anything else. Concurrent edits of one book can also leave a count off
+until then.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import BooleanField, Case, CharField, Count, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_save, pre_save
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Book, BookFacetCount
+
+# (key, lowest price included, highest price excluded)
+PRICE_BANDS = (
+    ('under-10', None, Decimal('10')),
+    ('10-25', Decimal('10'), Decimal('25')),
+    ('25-50', Decimal('25'), Decimal('50')),
+    ('50-100', Decimal('50'), Decimal('100')),
+    ('over-100', Decimal('100'), None),
+)
+PRICE_BAND_KEYS = [key for key, _, _ in PRICE_BANDS]
+FACETS = ('author', 'price_band', 'in_stock')
+AUTHOR_FACET_LIMIT = 20
+
+TRUE_VALUES = ('true', '1')
+FALSE_VALUES = ('false', '0')
+
+
+def price_band(price):
+    for key, _, high in PRICE_BANDS:
+        if high is None or price < high:
+            return key
+
+
+def facet_cell(author, price, stock):
+    # Values as assigned to a book may not be converted yet (price='9.50')
+    price = Book._meta.get_field('price').to_python(price)
+    stock = Book._meta.get_field('stock').to_python(stock)
+    return author, price_band(price), stock > 0
+
+
+def with_facet_values(books):
+    """``books`` annotated with ``price_band`` and ``in_stock``, as counted."""
+    return books.annotate(
+        price_band=Case(
+            *(When(price__lt=high, then=Value(key)) for key, _, high in PRICE_BANDS[:-1]),
+            default=Value(PRICE_BANDS[-1][0]),
+            output_field=CharField(),
+        ),
+        in_stock=ExpressionWrapper(Q(stock__gt=0), output_field=BooleanField()),
+    )
+
+
+def adjust_counts(changes):
+    """Apply ``{(author, price band, in stock): change}`` to the counts."""
+    for (author, band, in_stock), change in changes.items():
+        if not change:
+            continue
+        cell = BookFacetCount.objects.filter(author=author, price_band=band, in_stock=in_stock)
+        if cell.update(count=F('count') + change):
+            continue
+        try:
+            with transaction.atomic():
+                BookFacetCount.objects.create(author=author, price_band=band, in_stock=in_stock, count=change)
+        except IntegrityError:
+            # Created by a concurrent save in the meantime
+            cell.update(count=F('count') + change)
+
+
+def count_new_books(books):
+    """Count books that are not counted yet, e.g. fresh from ``bulk_create``."""
+    adjust_counts(Counter(facet_cell(book.author, book.price, book.stock) for book in books))
+
+
+def rebuild_counts():
+    """Recount every combination; returns the number of books counted."""
+    with transaction.atomic():
+        BookFacetCount.objects.all().delete()
+        cells = [
+            BookFacetCount(author=author, price_band=band, in_stock=in_stock, count=count)
+            for author, band, in_stock, count in (
+                with_facet_values(Book.objects.order_by())
+                .values_list('author', 'price_band', 'in_stock')
+                .annotate(books=Count('id'))
+            )
+        ]
+        BookFacetCount.objects.bulk_create(cells, batch_size=2000)
+    return sum(cell.count for cell in cells)
+
+
+def parse_bool(value, name):
+    if value.lower() in TRUE_VALUES:
+        return True
+    if value.lower() in FALSE_VALUES:
+        return False
+    raise ValidationError({name: ['Must be true or false.']})
+
+
+def facets_requested(request):
+    return request.query_params.get('facets', '').lower() in TRUE_VALUES
+
+
+def selected_facets(request):
+    """``{facet: selected value}`` from ``?author=``, ``?price_band=`` and ``?in_stock=``."""
+    selected = {}
+    if request.query_params.get('author'):
+        selected['author'] = request.query_params['author']
+    if request.query_params.get('price_band'):
+        if request.query_params['price_band'] not in PRICE_BAND_KEYS:
+            raise ValidationError({'price_band': [f"Must be one of: {', '.join(PRICE_BAND_KEYS)}."]})
+        selected['price_band'] = request.query_params['price_band']
+    if request.query_params.get('in_stock'):
+        selected['in_stock'] = parse_bool(request.query_params['in_stock'], 'in_stock')
+    return selected
+
+
+def facet_counts(selected, books=None):
+    """``{facet: [{'value', 'count'}, ...]}``, each facet counted among the books
+    matching the other facets' selections.
+
+    Read from the counts table, or when ``books`` is given (a queryset narrowed by
+    filters the table does not cover, e.g. a search), by grouping those books.
+    Authors come by count, at most ``AUTHOR_FACET_LIMIT``; every price band and
+    stock state is listed, in order.
+    """
+    if books is None:
+        cells, total = BookFacetCount.objects.all(), Sum('count')
+    else:
+        cells, total = with_facet_values(books.order_by()), Count('id')
+
+    facets = {}
+    for facet in FACETS:
+        rows = (
+            cells.filter(**{name: value for name, value in selected.items() if name != facet})
+            .values(facet).annotate(books=total).filter(books__gt=0)
+            .values_list(facet, 'books')
+        )
+        if facet == 'author':
+            rows = rows.order_by('-books', 'author')[:AUTHOR_FACET_LIMIT]
+            facets[facet] = [{'value': value, 'count': count} for value, count in rows]
+        else:
+            counts = dict(rows.order_by())
+            values = PRICE_BAND_KEYS if facet == 'price_band' else (True, False)
+            facets[facet] = [{'value': value, 'count': counts.get(value, 0)} for value in values]
+    return facets
+
+
+class BookFacetFilter(BaseFilterBackend):
+    """Keeps the books in the selected facets: ``?author=`` (exact), ``?price_band=``
+    (one of ``PRICE_BANDS``) and ``?in_stock=true|false``."""
+
+    def filter_queryset(self, request, queryset, view):
+        selected = selected_facets(request)
+        if 'author' in selected:
+            queryset = queryset.filter(author=selected['author'])
+        if 'price_band' in selected:
+            # A range on price, so the (price, id) index serves it
+            _, low, high = PRICE_BANDS[PRICE_BAND_KEYS.index(selected['price_band'])]
+            if low is not None:
+                queryset = queryset.filter(price__gte=low)
+            if high is not None:
+                queryset = queryset.filter(price__lt=high)
+        if 'in_stock' in selected:
+            queryset = queryset.filter(stock__gt=0) if selected['in_stock'] else queryset.filter(stock__lte=0)
+        return queryset
+
+
+def _on_book_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    # The combination the book is counted in before this save, if it exists. Read
+    # from the database written to: a replica may still have an older row
+    instance._facet_cell = None
+    if not raw and instance.pk is not None:
+        row = (
+            Book.objects.using(using or DEFAULT_DB_ALIAS).filter(pk=instance.pk)
+            .values_list('author', 'price', 'stock').first()
+        )
+        if row is not None:
+            instance._facet_cell = facet_cell(*row)
+
+
+def _on_book_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    changes = Counter({facet_cell(instance.author, instance.price, instance.stock): 1})
+    if instance._facet_cell is not None:
+        changes[instance._facet_cell] -= 1
+    adjust_counts(changes)
+
+
+def _on_book_deleted(sender, instance, **kwargs):
+    adjust_counts({facet_cell(instance.author, instance.price, instance.stock): -1})
+
+
+def connect_signals():
+    pre_save.connect(_on_book_pre_save, sender=Book, dispatch_uid='books.facets.pre_save')
+    post_save.connect(_on_book_saved, sender=Book, dispatch_uid='books.facets.saved')
+    post_delete.connect(_on_book_deleted, sender=Book, dispatch_uid='books.facets.deleted')
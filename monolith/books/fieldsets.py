@@ -0,0 +1,99 @@
+"""Sparse fieldsets: ``?fields=`` / ``?exclude=`` on serializer output.
+
+``?fields=id,title`` keeps only the listed fields, ``?exclude=stock`` drops the
+listed ones; nested serializers take dotted names, e.g.
+``?fields=items.quantity,items.book.title`` or ``?exclude=items.book``. Unknown
+names are a 400. Only safe requests (GET, HEAD) are pruned, so a write never
+loses input fields.
+
+``selected_columns(serializer)`` turns the remaining fields into the column
+paths for ``QuerySet.only()``, so the SQL reads no more than is sent: a model
+field source maps to its column, a nested serializer over a forward relation
+to that relation's columns (``book__title``, needs ``select_related``), and a
+``SerializerMethodField`` to the paths listed for it in
+``Meta.field_sources``. Reverse relations (``many=True``) are left to the
+caller's ``Prefetch``.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def parse_fieldset(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def _nested(names, field_name):
+    prefix = f'{field_name}.'
+    return {name[len(prefix):] for name in names if name.startswith(prefix)}
+
+
+class SparseFieldsetMixin:
+    """For ``ModelSerializer``s. A root serializer (or the child of a root
+    ``many=True`` one) reads the request; nested ones get their part from the parent."""
+
+    # (include or None for all, exclude), set by the parent serializer
+    fieldset = None
+
+    def request_fieldset(self):
+        root = self.root
+        if root is not self and not (root is self.parent and isinstance(root, serializers.ListSerializer)):
+            return None, set()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None, set()
+        include = request.GET.get(FIELDS_PARAM)
+        return (parse_fieldset(include) if include is not None else None,
+                parse_fieldset(request.GET.get(EXCLUDE_PARAM, '')))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include, exclude = self.fieldset or self.request_fieldset()
+        if include is None and not exclude:
+            return fields
+
+        for param, names in ((FIELDS_PARAM, include or set()), (EXCLUDE_PARAM, exclude)):
+            unknown = {name.split('.', 1)[0] for name in names} - set(fields)
+            if unknown:
+                raise serializers.ValidationError({param: [f"Unknown field(s): {', '.join(sorted(unknown))}"]})
+
+        for name in list(fields):
+            nested_include = None
+            if include is not None and name not in include:
+                nested_include = _nested(include, name)
+                if not nested_include:
+                    del fields[name]
+                    continue
+            if name in exclude:
+                del fields[name]
+                continue
+            nested = getattr(fields[name], 'child', fields[name])
+            if isinstance(nested, SparseFieldsetMixin):
+                nested.fieldset = (nested_include, _nested(exclude, name))
+        return fields
+
+
+def selected_columns(serializer, prefix=''):
+    """``only()`` paths for the fields ``serializer`` outputs, the primary key included."""
+    model = serializer.Meta.model
+    field_sources = getattr(serializer.Meta, 'field_sources', {})
+    columns = {prefix + model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in field_sources:
+            columns.update(prefix + path for path in field_sources[name])
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue  # not a model field, e.g. source='*', a property or a reverse accessor
+        if model_field.many_to_many or model_field.one_to_many:
+            continue
+        columns.add(prefix + model_field.name)
+        if model_field.is_relation and isinstance(field, SparseFieldsetMixin):
+            columns |= selected_columns(field, f'{prefix}{model_field.name}__')
+    return columns
@@ -0,0 +1,95 @@
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connection
+from books.importer import import_books
+from books.management.commands.benchmark_search import NAMES, WORDS
+from books.models import Book
+from books.pagination import after_position
+
+
+def book_queries():
+    """The access paths of the books API, named; each a queryset to explain and time.
+
+    All on default, the database whose indexes are dropped and rebuilt.
+    """
+    books = Book.objects.using(DEFAULT_DB_ALIAS)
+    middle = books.order_by('id')[books.count() // 2]
+    titles = list(books.order_by('-id').values_list('title', flat=True)[:100])
+    return [
+        ('first page by title', books.order_by('title', 'id')[:21]),
+        ('deep page by title', after_position(books, 'title', (middle.title, middle.id)).order_by('title', 'id')[:21]),
+        ('deep page by price', after_position(books, 'price', (middle.price, middle.id)).order_by('price', 'id')[:21]),
+        ('?author= by title', books.filter(author=middle.author).order_by('title', 'id')[:21]),
+        ('?stock=0 by title', books.filter(stock=0).order_by('title', 'id')[:21]),
+        ('?price= by title', books.filter(price=middle.price).order_by('title', 'id')[:21]),
+        ('import lookup (title in)', books.filter(title__in=titles).values_list('id', 'title', 'author')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN and time the books API queries without, then with, the indexes of Book.Meta.indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='runs per query')
+        parser.add_argument('--seed', type=int, default=0, help='first import this many synthetic books')
+        parser.add_argument('--plans', action='store_true', help='print the EXPLAIN output of every query')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+        if not Book.objects.using(DEFAULT_DB_ALIAS).exists():
+            self.stderr.write('No books; use --seed')
+            return
+        queries = book_queries()
+        indexes = Book._meta.indexes
+
+        with connection.schema_editor() as schema_editor:
+            for index in indexes:
+                schema_editor.remove_index(Book, index)
+        try:
+            before = self.run(queries, options['repeat'])
+        finally:
+            start = time.perf_counter()
+            with connection.schema_editor() as schema_editor:
+                for index in indexes:
+                    schema_editor.add_index(Book, index)
+            self.stdout.write(f'Rebuilt {len(indexes)} indexes in {time.perf_counter() - start:.1f}s')
+        after = self.run(queries, options['repeat'])
+
+        self.stdout.write(f'\n{Book.objects.using(DEFAULT_DB_ALIAS).count()} books, {connection.vendor}\n')
+        self.stdout.write(f"{'query':<26} {'before ms':>10} {'after ms':>10}")
+        for (name, _), (before_ms, before_plan), (after_ms, after_plan) in zip(queries, before, after):
+            self.stdout.write(f'{name:<26} {before_ms:>10.2f} {after_ms:>10.2f}')
+            if options['plans']:
+                self.stdout.write(f'  before: {before_plan}\n  after:  {after_plan}')
+        self.stdout.write('\n(median ms over --repeat runs)')
+
+    @staticmethod
+    def run(queries, repeat):
+        results = []
+        for _, queryset in queries:
+            plan = ' | '.join(queryset.explain().splitlines())
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())  # a fresh queryset, not the cached result
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append((statistics.median(timings), plan))
+        return results
+
+    def seed(self, count):
+        rows = (
+            json.dumps({
+                'title': ' '.join(random.sample(WORDS, random.randint(2, 5))).title() + f' #{random.randrange(10 ** 9)}',
+                'author': f'{random.choice(NAMES)} {random.choice(NAMES)}',
+                'price': f'{random.uniform(5, 120):.2f}',
+                'stock': random.randint(0, 100),
+            })
+            for _ in range(count)
+        )
+        stats = import_books(rows, 'jsonl')
+        self.stdout.write(f'Seeded {stats.created} books in {stats.elapsed:.1f}s')
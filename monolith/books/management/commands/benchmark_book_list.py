@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from books.fastpath import RowPlan
+from books.models import Book
+from books.serializers import BookSerializer
+
+DEFAULT_PAGE_SIZES = [20, 100, 1000, 10000]
+
+
+def serializer_page(size):
+    """The previous behaviour: model instances through ``BookSerializer(many=True)``."""
+    books = Book.objects.order_by('title', 'id')[:size]
+    return JSONRenderer().render(BookSerializer(books, many=True).data)
+
+
+def fastpath_page(size):
+    plan = RowPlan.for_serializer(BookSerializer())
+    rows = Book.objects.order_by('title', 'id').values_list(*plan.columns)[:size]
+    return JSONRenderer().render(plan.represent(rows))
+
+
+class Command(BaseCommand):
+    help = 'Compare the values_list fast path of /api/books/ with serializing model instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('page_sizes', nargs='*', type=int, default=DEFAULT_PAGE_SIZES)
+        parser.add_argument('--repeat', type=int, default=20, help='runs per page size and method')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{Book.objects.count()} books\n')
+        self.stdout.write(f"{'rows':>6} {'serializer ms':>14} {'fast path ms':>13} {'speed-up':>9}")
+        for size in options['page_sizes']:
+            if serializer_page(size) != fastpath_page(size):
+                raise CommandError(f'Fast path output differs from the serializer for {size} rows')
+            serializer_ms = self.measure(lambda: serializer_page(size), options['repeat'])
+            fastpath_ms = self.measure(lambda: fastpath_page(size), options['repeat'])
+            self.stdout.write(f'{size:>6} {serializer_ms:>14.2f} {fastpath_ms:>13.2f} '
+                              f'{serializer_ms / fastpath_ms:>8.1f}x')
+        self.stdout.write('\n(median ms over --repeat runs of query + serialization + JSON rendering; '
+                          'both outputs are checked to be byte-identical first)')
+
+    @staticmethod
+    def measure(run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from books.facets import count_new_books
+from books.models import Book
+from books.search import rebuild_index, search_books
+
+DEFAULT_QUERIES = ['python', 'clean code', 'martin', 'crockford', 'javascript good parts', 'zzzz']
+WORDS = [
+    'python', 'java', 'code', 'clean', 'design', 'patterns', 'data', 'learning', 'deep', 'web',
+    'systems', 'guide', 'practical', 'modern', 'art', 'programming', 'algorithms', 'network',
+    'database', 'cloud', 'security', 'testing', 'effective', 'advanced', 'introduction',
+]
+NAMES = ['Martin', 'Fowler', 'Hunt', 'Thomas', 'Bloch', 'Knuth', 'Nguyen', 'Tran', 'Le', 'Pham']
+
+
+def scan_search(query):
+    """The previous behaviour: every book where each term appears (icontains) in the title or the author."""
+    books = Book.objects.all()
+    for term in query.split():
+        books = books.filter(Q(title__icontains=term) | Q(author__icontains=term))
+    return list(books)
+
+
+class Command(BaseCommand):
+    help = 'Compare search-index queries with the LIKE %q% scans they replace'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+        parser.add_argument('--repeat', type=int, default=20, help='runs per query and method')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='first add this many synthetic books (and rebuild the index)')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+        self.stdout.write(f'{Book.objects.count()} books\n')
+        self.stdout.write(f"{'query':<24} {'index hits':>10} {'index ms':>9} {'scan hits':>10} {'scan ms':>9}")
+        for query in options['queries']:
+            index_ms, index_hits = self.measure(lambda: search_books(query)[0], options['repeat'])
+            scan_ms, scan_hits = self.measure(lambda: scan_search(query), options['repeat'])
+            self.stdout.write(f'{query:<24} {index_hits:>10} {index_ms:>9.2f} {scan_hits:>10} {scan_ms:>9.2f}')
+        self.stdout.write('\n(median ms over --repeat runs. The index returns the first ranked page of 20, '
+                          'the scan every match, unranked, as before; the index matches whole words, '
+                          'the scan any substring)')
+
+    @staticmethod
+    def measure(run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = len(run())
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), hits
+
+    def seed(self, count):
+        start = time.perf_counter()
+        books = Book.objects.bulk_create([
+            Book(
+                title=' '.join(random.sample(WORDS, random.randint(2, 5))).title(),
+                author=f'{random.choice(NAMES)} {random.choice(NAMES)}',
+                price=round(random.uniform(5, 120), 2),
+                stock=random.randint(0, 100),
+            )
+            for _ in range(count)
+        ], batch_size=2000)
+        # bulk_create sends no post_save signals
+        indexed = rebuild_index()
+        count_new_books(books)
+        self.stdout.write(f'Seeded {count} books, indexed {indexed} in {time.perf_counter() - start:.1f}s')
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:40
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# books/search.py as of this migration, frozen so later changes to the live
+# tokenizer do not rewrite what it did
+TITLE_WEIGHT = 3
+AUTHOR_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [token[:MAX_TERM_LENGTH] for token in WORD.findall(text)]
+
+
+def book_terms(title, author):
+    weights = Counter()
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(author):
+        weights[term] += AUTHOR_WEIGHT
+    return weights
+
+
+def index_existing_books(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookSearchTerm = apps.get_model('books', 'BookSearchTerm')
+    BookSearchTerm.objects.bulk_create([
+        BookSearchTerm(term=term, book_id=book_id, weight=weight)
+        for book_id, title, author in Book.objects.values_list('id', 'title', 'author').iterator()
+        for term, weight in book_terms(title, author).items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='books.book')),
+            ],
+            options={
+                'unique_together': {('term', 'book')},
+            },
+        ),
+        migrations.RunPython(index_existing_books, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:15
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# The price bands of books/facets.py as of this migration, frozen so later
+# changes to the live bands do not rewrite what it did: (key, price excluded)
+PRICE_BANDS = (
+    ('under-10', Decimal('10')),
+    ('10-25', Decimal('25')),
+    ('25-50', Decimal('50')),
+    ('50-100', Decimal('100')),
+    ('over-100', None),
+)
+
+
+def price_band(price):
+    for key, high in PRICE_BANDS:
+        if high is None or price < high:
+            return key
+
+
+def count_existing_books(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookFacetCount = apps.get_model('books', 'BookFacetCount')
+    counts = Counter(
+        (author, price_band(price), stock > 0)
+        for author, price, stock in Book.objects.values_list('author', 'price', 'stock').iterator()
+    )
+    BookFacetCount.objects.bulk_create([
+        BookFacetCount(author=author, price_band=band, in_stock=in_stock, count=count)
+        for (author, band, in_stock), count in counts.items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author', models.CharField(max_length=255)),
+                ('price_band', models.CharField(max_length=16)),
+                ('in_stock', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('author', 'price_band', 'in_stock')},
+            },
+        ),
+        migrations.RunPython(count_existing_books, migrations.RunPython.noop),
+    ]
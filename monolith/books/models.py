@@ -8,5 +8,46 @@ class Book(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField()
 
+    class Meta:
+        # id completes each index so keyset pages ((title, id) > (t, i), see
+        # pagination.py) are range scans; the author / stock ones serve the
+        # BookViewSet filters with its default title ordering
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['price', 'id'], name='book_price_id_idx'),
+            models.Index(fields=['author', 'title', 'id'], name='book_author_title_id_idx'),
+            models.Index(fields=['stock', 'title', 'id'], name='book_stock_title_id_idx'),
+        ]
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class BookSearchTerm(models.Model):
+    """One posting of the search index: ``term`` occurs in ``book``.
+
+    ``weight`` is the term frequency in the title (x3) plus in the author. Kept up
+    to date from book saves and deletes (see ``books/search.py``).
+    """
+    term = models.CharField(max_length=64)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('term', 'book')
+
+
+class BookFacetCount(models.Model):
+    """Number of books by ``author`` in ``price_band`` with ``in_stock`` (stock > 0).
+
+    One row per combination that occurs, so the table stays as small as the
+    number of authors times the price bands. Kept up to date from book saves and
+    deletes (see ``books/facets.py``).
+    """
+    author = models.CharField(max_length=255)
+    price_band = models.CharField(max_length=16)
+    in_stock = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('author', 'price_band', 'in_stock')
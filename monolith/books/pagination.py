@@ -0,0 +1,178 @@
+"""Keyset (cursor) pagination for the book catalogue.
+
+Pages are ordered by one sort field with ``id`` as the tie-breaker, and each page
+is read as ``WHERE (field, id) > (last field, last id) ORDER BY field, id LIMIT n + 1``,
+so a page costs the same anywhere in the catalogue and no ``COUNT(*)`` is run.
+The extra row only tells whether there is a next page.
+
+A cursor is an opaque token holding the ordering, the ``(field, id)`` position of
+the first or last row of a page and the direction to walk from it.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+ORDERINGS = ('title', '-title', 'price', '-price')
+DEFAULT_ORDERING = 'title'
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, items, ordering, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.ordering = ordering
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+
+def encode_cursor(ordering, row, reverse=False):
+    position = [str(getattr(row, ordering.lstrip('-'))), row.id]
+    token = json.dumps({'o': ordering, 'p': position, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, orderings=ORDERINGS):
+    """Returns ``(ordering, (value, id), reverse)``; raises ``InvalidCursor``."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        value, row_id = data['p']
+        ordering, position, reverse = data['o'], (str(value), int(row_id)), bool(data['r'])
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}') from exc
+    if ordering not in orderings:
+        raise InvalidCursor(f'Invalid cursor ordering: {ordering!r}')
+    return ordering, position, reverse
+
+
+def after_position(queryset, field, position, descending=False):
+    """Rows after ``position`` = ``(value, id)`` in ``(field, id)`` order.
+
+    ``field >= value AND (field > value OR id > row id)``: the first, redundant
+    bound lets a ``(field, id)`` index seek straight to the position, where
+    ``field > value OR (field = value AND id > row id)`` alone scans up to it.
+    """
+    value, row_id = position
+    lookup = 'lt' if descending else 'gt'
+    return queryset.filter(
+        Q(**{f'{field}__{lookup}e': value}),
+        Q(**{f'{field}__{lookup}': value}) | Q(**{f'id__{lookup}': row_id}),
+    )
+
+
+def keyset_page(queryset, ordering=DEFAULT_ORDERING, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                orderings=ORDERINGS):
+    """One page of ``queryset``; the cursor, when given, decides the ordering."""
+    position, reverse = None, False
+    if cursor:
+        ordering, position, reverse = decode_cursor(cursor, orderings)
+    field = ordering.lstrip('-')
+    # Walking backwards from a position is the same query in the opposite order
+    descending = ordering.startswith('-') != reverse
+
+    if position is not None:
+        queryset = after_position(queryset, field, position, descending)
+    order = (f'-{field}', '-id') if descending else (field, 'id')
+    rows = list(queryset.order_by(*order)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    # Coming from a cursor, the page it was taken from lies the other way
+    has_next = position is not None if reverse else has_more
+    has_previous = has_more if reverse else position is not None
+    return KeysetPage(
+        rows,
+        ordering,
+        next_cursor=encode_cursor(ordering, rows[-1]) if rows and has_next else None,
+        previous_cursor=encode_cursor(ordering, rows[0], reverse=True) if rows and has_previous else None,
+    )
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination class over ``keyset_page``.
+
+    Query parameters: ``ordering``, ``page_size`` (capped at ``max_page_size``) and
+    ``cursor`` (taken from the ``next`` / ``previous`` links of a previous response).
+    On a view with ``ordering_fields`` / ``ordering`` (``OrderingFilter``), those
+    decide the allowed and default orderings; otherwise ``orderings`` and
+    ``default_ordering`` do. Any other ordering is answered with 400.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size_query_param = 'page_size'
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    orderings = ORDERINGS
+    default_ordering = DEFAULT_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        orderings, _ = self.get_orderings(view)
+        try:
+            self.page = keyset_page(
+                queryset,
+                ordering=self.get_ordering(request, view),
+                cursor=request.GET.get(self.cursor_query_param),
+                page_size=self.get_page_size(request),
+                orderings=orderings,
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        return self.page.items
+
+    def get_ordering(self, request, view=None):
+        """The ordering the page will be read in: the cursor's, else the ordering parameter's."""
+        orderings, default_ordering = self.get_orderings(view)
+        cursor = request.GET.get(self.cursor_query_param)
+        if cursor:
+            try:
+                return decode_cursor(cursor, orderings)[0]
+            except InvalidCursor:
+                pass  # paginate_queryset answers 404
+        ordering = request.GET.get(self.ordering_query_param) or default_ordering
+        if ordering not in orderings:
+            # Pages are keyed on one field, so e.g. OrderingFilter's 'author,title' cannot be served
+            raise ValidationError({self.ordering_query_param: [f"Must be one of: {', '.join(orderings)}."]})
+        return ordering
+
+    def get_orderings(self, view):
+        fields = getattr(view, 'ordering_fields', None)
+        if not fields or fields == '__all__':
+            return self.orderings, self.default_ordering
+        orderings = tuple(prefix + field for field in fields for prefix in ('', '-'))
+        default_ordering = (getattr(view, 'ordering', None) or [fields[0]])[0]
+        return orderings, default_ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        # The cursor carries the ordering, so the ordering parameter is dropped
+        url = remove_query_param(self.request.build_absolute_uri(), self.ordering_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
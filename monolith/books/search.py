@@ -0,0 +1,183 @@
+"""Inverted-index search over book titles and authors.
+
+Titles and authors are tokenised (lower-cased, Vietnamese diacritics folded, split
+on non-word characters) into ``BookSearchTerm`` postings. A query is tokenised
+the same way and answered from the postings alone, through the ``(term, book)``
+index, instead of scanning every row with ``LIKE '%q%'``.
+
+A book matches when it contains every query term. Matches are ranked by TF-IDF:
+the sum over query terms of ``weight * log(1 + N / df)``, where ``weight`` counts
+occurrences (title x3, author x1), ``df`` is the number of books containing the
+term and ``N`` the number of books.
+
+The index is updated on every book save or delete (signals connected in
+``BooksConfig.ready``); ``bulk_create`` and ``QuerySet.update()`` send no
+signals, so the importer calls ``index_new_books`` itself and
+``rebuild_search_index`` rebuilds the index from scratch after anything else.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.signals import post_delete, post_save
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Book, BookSearchTerm
+
+TITLE_WEIGHT = 3
+AUTHOR_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+BOOK_COUNT_CACHE_KEY = 'books:search:book_count'
+BOOK_COUNT_TIMEOUT = 300
+
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    # 'đ' is a letter of its own, not a 'd' with a combining mark
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [token[:MAX_TERM_LENGTH] for token in WORD.findall(text)]
+
+
+def book_terms(title, author):
+    weights = Counter()
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(author):
+        weights[term] += AUTHOR_WEIGHT
+    return weights
+
+
+def index_book(book):
+    with transaction.atomic():
+        BookSearchTerm.objects.filter(book=book).delete()
+        BookSearchTerm.objects.bulk_create([
+            BookSearchTerm(term=term, book=book, weight=weight)
+            for term, weight in book_terms(book.title, book.author).items()
+        ])
+
+
+def index_new_books(books, batch_size=2000):
+    """Add the postings of books that have none yet, e.g. fresh from ``bulk_create``."""
+    BookSearchTerm.objects.bulk_create([
+        BookSearchTerm(term=term, book_id=book.pk, weight=weight)
+        for book in books
+        for term, weight in book_terms(book.title, book.author).items()
+    ], batch_size=batch_size)
+    if books:
+        cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def rebuild_index(batch_size=2000):
+    """Rebuild every posting; returns the number of books indexed."""
+    indexed = 0
+    with transaction.atomic():
+        BookSearchTerm.objects.all().delete()
+        last_id = 0
+        while True:
+            books = list(Book.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'title', 'author')[:batch_size])
+            if not books:
+                break
+            BookSearchTerm.objects.bulk_create([
+                BookSearchTerm(term=term, book_id=book_id, weight=weight)
+                for book_id, title, author in books
+                for term, weight in book_terms(title, author).items()
+            ], batch_size=batch_size)
+            indexed += len(books)
+            last_id = books[-1][0]
+    cache.delete(BOOK_COUNT_CACHE_KEY)
+    return indexed
+
+
+def _on_book_saved(sender, instance, update_fields=None, **kwargs):
+    # e.g. stock-only saves leave the postings as they are
+    if update_fields is None or {'title', 'author'} & set(update_fields):
+        index_book(instance)
+    if kwargs.get('created'):
+        cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def _on_book_deleted(sender, instance, **kwargs):
+    # The postings themselves go with the book (on_delete=CASCADE)
+    cache.delete(BOOK_COUNT_CACHE_KEY)
+
+
+def connect_signals():
+    post_save.connect(_on_book_saved, sender=Book, dispatch_uid='books.search.saved')
+    post_delete.connect(_on_book_deleted, sender=Book, dispatch_uid='books.search.deleted')
+
+
+def query_terms(query):
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def matching_postings(terms):
+    """Postings grouped per book, keeping books that contain every term."""
+    return (
+        BookSearchTerm.objects.filter(term__in=terms)
+        .values('book_id')
+        .annotate(matched=Count('term'))
+        .filter(matched=len(terms))
+    )
+
+
+def search_books(query, offset=0, limit=20):
+    """Ranked matches for ``query``: ``(books, has_more)``, each book with a ``score``.
+
+    One extra row is read to tell whether there are more results; matches are
+    never counted.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return [], False
+
+    book_count = cache.get_or_set(BOOK_COUNT_CACHE_KEY, Book.objects.count, BOOK_COUNT_TIMEOUT)
+    document_frequency = dict(
+        BookSearchTerm.objects.filter(term__in=terms).values_list('term').annotate(df=Count('id'))
+    )
+    if len(document_frequency) < len(terms):
+        return [], False  # some term occurs nowhere
+
+    idf = Case(
+        *(When(term=term, then=Value(math.log(1 + book_count / df))) for term, df in document_frequency.items()),
+        output_field=FloatField(),
+    )
+    ranked = list(
+        matching_postings(terms)
+        .annotate(score=Sum(F('weight') * idf, output_field=FloatField()))
+        .order_by('-score', 'book_id')
+        .values_list('book_id', 'score')[offset:offset + limit + 1]
+    )
+    has_more = len(ranked) > limit
+    ranked = ranked[:limit]
+
+    books_by_id = Book.objects.in_bulk([book_id for book_id, _ in ranked])
+    books = []
+    for book_id, score in ranked:
+        book = books_by_id.get(book_id)
+        if book is not None:
+            book.score = round(score, 4)
+            books.append(book)
+    return books, has_more
+
+
+class BookIndexSearchFilter(BaseFilterBackend):
+    """``?search=`` through the search index: keeps books containing every term.
+
+    Replaces DRF's ``SearchFilter`` for books, which runs ``icontains`` on each field.
+    Only filters; ordering is left to the view.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = query_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        return queryset.filter(id__in=matching_postings(terms).values('book_id'))
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from .fieldsets import SparseFieldsetMixin
 from .models import Book
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ['id', 'title', 'author', 'price', 'stock']
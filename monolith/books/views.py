@@ -1,8 +1,31 @@
+from django.http import Http404
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from cart.reservations import with_available
 from .models import Book
+from .pagination import ORDERINGS, DEFAULT_ORDERING, InvalidCursor, keyset_page
+
+ORDERING_LABELS = {
+    'title': 'Tên sách (A-Z)',
+    '-title': 'Tên sách (Z-A)',
+    'price': 'Giá tăng dần',
+    '-price': 'Giá giảm dần',
+}
 
 @login_required
 def book_list(request):
-    books = Book.objects.all()
-    return render(request, 'books/book_list.html', {'books': books})
\ No newline at end of file
+    ordering = request.GET.get('ordering', DEFAULT_ORDERING)
+    if ordering not in ORDERINGS:
+        ordering = DEFAULT_ORDERING
+    try:
+        # Copies held in carts are not on offer
+        page = keyset_page(with_available(Book.objects.all()), ordering=ordering, cursor=request.GET.get('cursor'))
+    except InvalidCursor:
+        raise Http404('Invalid cursor')
+    return render(request, 'books/book_list.html', {
+        'books': page.items,
+        'ordering': page.ordering,
+        'orderings': ORDERING_LABELS,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
@@ -0,0 +1,171 @@
+"""Read-replica routing for catalogue reads.
+
+Reads of the catalogue apps (``CATALOGUE_APPS``) go to one of the replica
+aliases listed in ``REPLICA_ROUTING['REPLICAS']``; every write, and every read of
+other apps (sessions, auth, ...), goes to ``default``. With no replicas
+configured everything stays on ``default``.
+
+Reads stay on ``default`` when they must see the primary's latest state:
+
+* inside a transaction on ``default``, e.g. the ``SELECT`` after an ``UPDATE``
+  in ``transaction.atomic()``;
+* for the whole of an unsafe request (POST, PUT, PATCH, DELETE), whose reads
+  usually decide what it writes, and for the rest of any request once it has
+  written a catalogue model (read-your-writes, see ``ReplicaPinMiddleware``),
+  including the reads of a streaming response's content (e.g. the export);
+* when no replica is healthy: each replica's lag is checked at most every
+  ``LAG_CHECK_INTERVAL`` seconds, and one more than ``MAX_LAG`` seconds behind,
+  with replication stopped, or unreachable is skipped until the next check.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+CATALOGUE_APPS = {'books'}
+UNSAFE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+logger = logging.getLogger(__name__)
+# The current request's RequestState, None outside requests
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        # One replica per request, so its reads never go back in time
+        self.replica = None
+
+
+def routing_settings():
+    return {
+        'REPLICAS': [],
+        'MAX_LAG': 5,
+        'LAG_CHECK_INTERVAL': 5,
+        **getattr(settings, 'REPLICA_ROUTING', {}),
+    }
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind its primary; ``None`` when replication is not running."""
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return 0  # no lag to read; assumed in sync
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute('SHOW REPLICA STATUS')  # MySQL 8.0.22+
+        except DatabaseError:
+            cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return 0  # not a replica, e.g. an alias for the primary itself
+        status = dict(zip((column[0] for column in cursor.description), row))
+    return status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+
+
+class ReplicaHealth:
+    """Cached lag checks: which replicas may serve reads right now."""
+
+    def __init__(self):
+        self._checked = {}  # alias -> (monotonic time of the check, healthy)
+        self._lock = threading.Lock()
+
+    def healthy(self, alias, max_lag, interval):
+        checked_at, healthy = self._checked.get(alias, (None, False))
+        if checked_at is not None and time.monotonic() - checked_at < interval:
+            return healthy
+        with self._lock:
+            checked_at, healthy = self._checked.get(alias, (None, False))
+            if checked_at is None or time.monotonic() - checked_at >= interval:
+                healthy = self._check(alias, max_lag)
+                self._checked[alias] = (time.monotonic(), healthy)
+        return healthy
+
+    @staticmethod
+    def _check(alias, max_lag):
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            logger.warning('Replica %s unreachable, reading from %s', alias, DEFAULT_DB_ALIAS, exc_info=True)
+            return False
+        if lag is None or lag > max_lag:
+            logger.warning('Replica %s lag is %s (max %ss), reading from %s', alias, lag, max_lag, DEFAULT_DB_ALIAS)
+            return False
+        return True
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in CATALOGUE_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and state.pinned:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state is not None and state.replica is not None:
+            return state.replica
+        options = routing_settings()
+        healthy = [
+            alias for alias in options['REPLICAS']
+            if replica_health.healthy(alias, options['MAX_LAG'], options['LAG_CHECK_INTERVAL'])
+        ]
+        alias = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+        if state is not None:
+            state.replica = alias
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in CATALOGUE_APPS:
+            state = _request_state.get()
+            if state is not None:
+                state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinMiddleware:
+    """Tracks, per request, whether catalogue reads must go to ``default``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(pinned=request.method in UNSAFE_METHODS)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if response.streaming and not response.is_async:
+            # Its content is read after this returns: keep the same state for it
+            response.streaming_content = _with_state(state, response.streaming_content)
+        return response
+
+
+def _with_state(state, content):
+    """Iterate ``content`` with ``state`` as the request's, chunk by chunk."""
+    chunks, end = iter(content), object()
+    while True:
+        token = _request_state.set(state)
+        try:
+            chunk = next(chunks, end)
+        finally:
+            _request_state.reset(token)
+        if chunk is end:
+            return
+        yield chunk
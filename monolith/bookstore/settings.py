@@ -54,6 +54,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'bookstore.db_routing.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -97,6 +98,21 @@ DATABASES = {
     }
 }
 
+# Read replicas of default (see bookstore/db_routing.py): add each to DATABASES
+# with 'TEST': {'MIRROR': 'default'} and list its alias in REPLICAS. Book reads then
+# go to a replica at most MAX_LAG seconds behind (checked every LAG_CHECK_INTERVAL
+# seconds), except in transactions and in requests that write books.
+DATABASE_ROUTERS = ['bookstore.db_routing.ReplicaRouter']
+REPLICA_ROUTING = {
+    'REPLICAS': [],
+    'MAX_LAG': 5,
+    'LAG_CHECK_INTERVAL': 5,
+}
+
+# Seconds the copies put in a cart stay reserved after the item's last change
+# (see cart/reservations.py)
+STOCK_HOLD_TTL = 15 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
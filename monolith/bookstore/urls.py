@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.views.generic import RedirectView
 from rest_framework.routers import DefaultRouter
 from accounts.api_views import CustomerViewSet
-from books.api_views import BookViewSet
+from books.api_views import BookViewSet, export_books
 from cart.api_views import CartViewSet, CartItemViewSet
 
 # API Router
@@ -19,6 +19,8 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('books/', include('books.urls')),
     path('cart/', include('cart.urls')),
+    # Before the router, whose book detail route would match 'export'
+    path('api/books/export/', export_books, name='book_export'),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
 ]
\ No newline at end of file
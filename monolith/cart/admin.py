@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Cart, CartItem
+from .models import Cart, CartItem, StockHold
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
@@ -14,3 +14,9 @@ class CartItemAdmin(admin.ModelAdmin):
     list_filter = ('cart__created_at',)
     search_fields = ('cart__customer__email', 'book__title')
     ordering = ('-cart__created_at',)
+
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    list_display = ('cart', 'book', 'quantity', 'expires_at')
+    search_fields = ('cart__customer__email', 'book__title')
+    ordering = ('-expires_at',)
@@ -1,22 +1,48 @@
+from contextlib import contextmanager
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.db.models import Prefetch
+from . import reservations
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
+from books.fieldsets import selected_columns
 from books.models import Book
 
+@contextmanager
+def reservation_errors():
+    """``reservations`` failures as API errors"""
+    try:
+        yield
+    except Book.DoesNotExist:
+        raise NotFound({'error': 'Book not found'})
+    except reservations.InsufficientStock as e:
+        raise ValidationError({'error': f'Only {e.available} items available in stock'})
+
 class CartViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Cart.objects.filter(customer=self.request.user)
+        return Cart.objects.filter(customer=self.request.user).prefetch_related(self.items_prefetch())
+    
+    def items_prefetch(self):
+        """Items with their books in one query, reading only the columns the response needs"""
+        fields = self.get_serializer().fields
+        # cart joins the items to their cart; the totals read quantity and price
+        columns = {'cart', 'quantity', 'book', 'book__price'}
+        if 'items' in fields:
+            columns |= selected_columns(fields['items'].child)
+        return Prefetch('cartitem_set', queryset=CartItem.objects.select_related('book').only(*columns))
     
     @action(detail=False, methods=['get'])
     def current(self, request):
         """Get or create current user's cart"""
-        cart, created = Cart.objects.get_or_create(customer=request.user)
+        cart, created = self.get_queryset().get_or_create(customer=request.user)
         serializer = self.get_serializer(cart)
         return Response(serializer.data)
     
@@ -40,22 +66,15 @@ class CartViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        if book.stock < quantity:
+        if quantity < 1:
             return Response(
-                {'error': f'Only {book.stock} items available in stock'}, 
+                {'error': 'Quantity must be at least 1'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         cart, _ = Cart.objects.get_or_create(customer=request.user)
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart, 
-            book=book,
-            defaults={'quantity': quantity}
-        )
-        
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save()
+        with reservation_errors():
+            cart_item, created = reservations.add(cart.id, book.id, quantity)
         
         serializer = CartItemSerializer(cart_item)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -65,7 +84,9 @@ class CartViewSet(viewsets.ReadOnlyModelViewSet):
         """Clear all items from cart"""
         try:
             cart = Cart.objects.get(customer=request.user)
-            cart.cartitem_set.all().delete()
+            with transaction.atomic():
+                cart.cartitem_set.all().delete()
+                reservations.release(cart.id)
             return Response(
                 {'message': 'Cart cleared successfully'}, 
                 status=status.HTTP_204_NO_CONTENT
@@ -81,15 +102,40 @@ class CartItemViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return CartItem.objects.filter(cart__customer=self.request.user)
+        queryset = CartItem.objects.filter(cart__customer=self.request.user).select_related('book')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*selected_columns(self.get_serializer()))
+        return queryset
     
     def perform_create(self, serializer):
         cart, _ = Cart.objects.get_or_create(customer=self.request.user)
-        serializer.save(cart=cart)
+        book_id = serializer.validated_data['book_id']
+        quantity = serializer.validated_data.get('quantity', 1)
+        # One item per book: adding a book already in the cart adds to its quantity
+        with reservation_errors():
+            serializer.instance, _ = reservations.add(cart.id, book_id, quantity)
+    
+    def perform_update(self, serializer):
+        item = serializer.instance
+        book_id = serializer.validated_data.get('book_id', item.book_id)
+        quantity = serializer.validated_data.get('quantity', item.quantity)
+        if book_id != item.book_id:
+            # Merged into the cart's item for that book if it has one
+            with reservation_errors():
+                serializer.instance = reservations.move(item, book_id, quantity)
+            return
+        with transaction.atomic():
+            with reservation_errors():
+                reservations.hold(item.cart_id, book_id, quantity)
+            serializer.save()
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            reservations.release(instance.cart_id, [instance.book_id])
     
     def update(self, request, *args, **kwargs):
         """Update cart item quantity"""
-        instance = self.get_object()
         quantity = request.data.get('quantity')
         
         if quantity is not None:
@@ -98,11 +144,5 @@ class CartItemViewSet(viewsets.ModelViewSet):
                     {'error': 'Quantity must be at least 1'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            if instance.book.stock < quantity:
-                return Response(
-                    {'error': f'Only {instance.book.stock} items available'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
         
         return super().update(request, *args, **kwargs)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from cart.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired stock holds (they already no longer count against availability)'
+
+    def handle(self, *args, **kwargs):
+        released = release_expired()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired holds'))
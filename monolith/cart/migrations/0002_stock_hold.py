@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 11:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_indexes'),
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='books.book')),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cart.cart')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['book', 'expires_at', 'quantity'], name='stockhold_book_expiry_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cart', 'book'), name='stockhold_cart_book_uniq')],
+            },
+        ),
+    ]
@@ -17,4 +17,23 @@ class CartItem(models.Model):
     quantity = models.IntegerField(default=1)
 
     def __str__(self):
-        return f"{self.quantity} of {self.book.title}"
\ No newline at end of file
+        return f"{self.quantity} of {self.book.title}"
+
+class StockHold(models.Model):
+    """Copies of a book set aside for a cart until expires_at (see cart/reservations.py)"""
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'book'], name='stockhold_cart_book_uniq'),
+        ]
+        indexes = [
+            # SUM(quantity) of a book's unexpired holds is read from this index alone
+            models.Index(fields=['book', 'expires_at', 'quantity'], name='stockhold_book_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} of book {self.book_id} held until {self.expires_at}"
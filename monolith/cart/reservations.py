@@ -0,0 +1,127 @@
+"""Stock reservations: short-lived holds on the copies put in carts.
+
+Each cart item holds its quantity of the book for ``STOCK_HOLD_TTL`` seconds
+from its last change. A book's availability is its stock minus its active
+(unexpired) holds, a ``SUM`` read from the ``(book, expires_at, quantity)``
+index alone. Nothing has to release a hold on time: an expired hold simply stops
+counting, and expired rows are deleted the next time a hold on the same book is
+placed (or by ``manage.py release_expired_holds``).
+
+``hold()`` locks the book row only for the few statements that check
+availability and write the hold, so two carts cannot both take the last copy,
+and no lock is held while a customer shops. Call it in the same transaction as
+the cart item write it covers; ``add()`` does both for adding to a cart.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from books.models import Book
+from .models import CartItem, StockHold
+
+DEFAULT_TTL = 15 * 60
+
+
+class InsufficientStock(Exception):
+    def __init__(self, book, available):
+        self.book = book
+        self.available = max(available, 0)
+        super().__init__(f'Only {self.available} copies of "{book.title}" available')
+
+
+def hold_ttl():
+    return timedelta(seconds=getattr(settings, 'STOCK_HOLD_TTL', DEFAULT_TTL))
+
+
+def active_holds(now=None):
+    return StockHold.objects.filter(expires_at__gt=now or timezone.now())
+
+
+def with_available(books, now=None):
+    """``books`` annotated with ``available``: stock minus the copies held in carts."""
+    held = (
+        active_holds(now).filter(book=OuterRef('pk'))
+        .values('book').annotate(total=Sum('quantity')).values('total')
+    )
+    held = Coalesce(Subquery(held, output_field=IntegerField()), Value(0))
+    return books.annotate(available=Greatest(F('stock') - held, Value(0)))
+
+
+def hold(cart_id, book_id, quantity):
+    """Hold ``quantity`` copies of the book for the cart, replacing its previous hold.
+
+    Raises ``Book.DoesNotExist``, or ``InsufficientStock`` when the stock minus
+    the other carts' active holds is less than ``quantity``.
+    """
+    with transaction.atomic():
+        book = Book.objects.select_for_update().only('id', 'title', 'stock').get(id=book_id)
+        now = timezone.now()
+        held_by_others = (
+            active_holds(now).filter(book=book).exclude(cart_id=cart_id)
+            .aggregate(total=Sum('quantity'))['total'] or 0
+        )
+        if quantity > book.stock - held_by_others:
+            raise InsufficientStock(book, book.stock - held_by_others)
+        StockHold.objects.update_or_create(
+            cart_id=cart_id, book=book, defaults={'quantity': quantity, 'expires_at': now + hold_ttl()},
+        )
+        # Lazy release: the book is locked anyway
+        StockHold.objects.filter(book=book, expires_at__lte=now).delete()
+    return book
+
+
+def add(cart_id, book_id, quantity):
+    """Add ``quantity`` copies of the book to the cart, holding them; returns ``(item, created)``.
+
+    The book row is locked before the item's quantity is read, so concurrent
+    adds of one book (to the same cart too) run one after the other and none
+    is lost. Raises like ``hold()``.
+    """
+    with transaction.atomic():
+        Book.objects.select_for_update().only('id').get(id=book_id)
+        item, created = CartItem.objects.select_for_update().get_or_create(
+            cart_id=cart_id, book_id=book_id, defaults={'quantity': 0},
+        )
+        hold(cart_id, book_id, item.quantity + quantity)
+        item.quantity += quantity
+        item.save(update_fields=['quantity'])
+    return item, created
+
+
+def move(item, book_id, quantity):
+    """Point cart item ``item`` at another book with ``quantity`` copies, holding them.
+
+    A cart has one item per book: if it already has one for ``book_id``, ``item``
+    is merged into it (the quantities added up, and held together) and deleted.
+    Returns the item now holding the copies. Raises like ``hold()``.
+    """
+    with transaction.atomic():
+        Book.objects.select_for_update().only('id').get(id=book_id)
+        release(item.cart_id, [item.book_id])
+        target = CartItem.objects.select_for_update().filter(cart_id=item.cart_id, book_id=book_id).first()
+        if target is None:
+            hold(item.cart_id, book_id, quantity)
+            item.book_id, item.quantity = book_id, quantity
+            item.save(update_fields=['book', 'quantity'])
+            return item
+        hold(item.cart_id, book_id, target.quantity + quantity)
+        target.quantity += quantity
+        target.save(update_fields=['quantity'])
+        item.delete()
+    return target
+
+
+def release(cart_id, book_ids=None):
+    """Drop the cart's holds, on every book or only on ``book_ids``."""
+    holds = StockHold.objects.filter(cart_id=cart_id)
+    if book_ids is not None:
+        holds = holds.filter(book_id__in=book_ids)
+    holds.delete()
+
+
+def release_expired(now=None):
+    return StockHold.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
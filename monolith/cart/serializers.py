@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
+from books.fieldsets import SparseFieldsetMixin
 from books.serializers import BookSerializer
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     book = BookSerializer(read_only=True)
     book_id = serializers.IntegerField(write_only=True)
     subtotal = serializers.SerializerMethodField()
@@ -11,6 +12,8 @@ class CartItemSerializer(serializers.ModelSerializer):
         model = CartItem
         fields = ['id', 'cart', 'book', 'book_id', 'quantity', 'subtotal']
         read_only_fields = ['id', 'cart']
+        # Columns the method fields read, for selected_columns()
+        field_sources = {'subtotal': ['quantity', 'book', 'book__price']}
     
     def get_subtotal(self, obj):
         return obj.book.price * obj.quantity
@@ -20,7 +23,7 @@ class CartItemSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Quantity must be at least 1")
         return value
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True, source='cartitem_set')
     total_items = serializers.SerializerMethodField()
     total_price = serializers.SerializerMethodField()
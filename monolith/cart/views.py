@@ -1,29 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from . import reservations
 from .models import Cart, CartItem
 from books.models import Book
 
 @login_required
 def add_to_cart(request, book_id):
     book = get_object_or_404(Book, id=book_id)
+    cart, _ = Cart.objects.get_or_create(customer=request.user)
     
-    if book.stock < 1:
-        messages.error(request, f'Sorry, "{book.title}" is out of stock.')
+    try:
+        # Holds the copies and writes the quantity together, or neither if they are not available
+        _, created = reservations.add(cart.id, book.id, 1)
+    except reservations.InsufficientStock as e:
+        if e.available < 1:
+            messages.error(request, f'Sorry, "{book.title}" is out of stock.')
+        else:
+            messages.warning(request, f'Only {e.available} copies of "{book.title}" available.')
         return redirect('book_list')
     
-    cart, _ = Cart.objects.get_or_create(customer=request.user)
-    cart_item, created = CartItem.objects.get_or_create(cart=cart, book=book)
-    
-    if not created:
-        if book.stock < cart_item.quantity + 1:
-            messages.warning(request, f'Only {book.stock} copies of "{book.title}" available.')
-            return redirect('book_list')
-        cart_item.quantity += 1
-        cart_item.save()
-        messages.success(request, f'Added another copy of "{book.title}" to your cart.')
-    else:
+    if created:
         messages.success(request, f'"{book.title}" added to your cart!')
+    else:
+        messages.success(request, f'Added another copy of "{book.title}" to your cart.')
     
     return redirect('view_cart')
 
@@ -61,7 +62,9 @@ def remove_from_cart(request, item_id):
         cart_item = get_object_or_404(CartItem, id=item_id)
         if cart_item.cart.customer == request.user:
             book_title = cart_item.book.title
-            cart_item.delete()
+            with transaction.atomic():
+                cart_item.delete()
+                reservations.release(cart_item.cart_id, [cart_item.book_id])
             messages.success(request, f'Đã xóa "{book_title}" khỏi giỏ hàng!')
         else:
             messages.error(request, 'Không thể xóa sản phẩm này.')
@@ -75,12 +78,14 @@ def update_cart_item(request, item_id):
         if cart_item.cart.customer == request.user:
             quantity = int(request.POST.get('quantity', 1))
             if quantity > 0:
-                if quantity <= cart_item.book.stock:
-                    cart_item.quantity = quantity
-                    cart_item.save()
+                try:
+                    with transaction.atomic():
+                        reservations.hold(cart_item.cart_id, cart_item.book_id, quantity)
+                        cart_item.quantity = quantity
+                        cart_item.save()
                     messages.success(request, f'Đã cập nhật số lượng!')
-                else:
-                    messages.error(request, f'Chỉ còn {cart_item.book.stock} quyển.')
+                except reservations.InsufficientStock as e:
+                    messages.error(request, f'Chỉ còn {e.available} quyển.')
             else:
                 messages.error(request, 'Số lượng phải lớn hơn 0.')
         else: